@@ -10,15 +10,64 @@ bl_info = {
 
 import bpy
 import json
+import math
 import threading
+import zipfile
+import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
-import queue
+import selectors
+import socket
+from urllib.parse import urlsplit, parse_qs, unquote
 import os
+import re
 import sys
 import importlib
 
-# Thread-safe command queue
-command_queue = queue.Queue()
+from .events import EventLog
+from .jobs import Job, JobStore
+from .metrics import Metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .pool import WorkerPool, blocking
+from . import log, profiling
+from .log import Truncated
+from .scheduler import CommandScheduler, SessionQueue
+from .sessions import (SESSION_HEADER, valid_session_id, uses_global_actions,
+                       session_scope, list_sessions, remove_session)
+from .snapshot import SnapshotPublisher, OBJECT_FIELDS
+
+# Leveled console logging; per-command detail is only formatted at DEBUG (BLEND_REST_LOG_LEVEL)
+log.configure()
+logger = log.get_logger()
+
+# Thread-safe queue of Job objects with one FIFO per session, drained round-robin on Blender's main thread
+command_queue = SessionQueue()
+
+# Recent jobs by id for GET /v1/jobs; bounded so long-running sessions don't grow without limit
+job_store = JobStore(max_jobs=1000, ttl=3600.0)
+
+# Seconds the HTTP thread waits for a command (?wait=true) or batch before answering "queued",
+# and the longest wait a client may ask for with ?timeout= or a batch's "timeout"
+WAIT_TIMEOUT = 60.0
+MAX_WAIT_TIMEOUT = 600.0
+
+# Longest long-poll wait for GET /v1/events, and the SSE heartbeat period
+EVENTS_TIMEOUT = 60.0
+SSE_HEARTBEAT = 15.0
+
+# Largest page size for GET /v1/models?limit=
+MODELS_PAGE_LIMIT = 10000
+
+# Largest accepted request body; big enough for dense polygon_shape payloads
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+# Size of the pieces GET /v1/files/<id> reads and sends export files in
+FILE_CHUNK_BYTES = 1024 * 1024
+
+FILE_CONTENT_TYPES = {
+    'stl': 'model/stl',
+    'obj': 'model/obj',
+    '3mf': 'model/3mf',
+    'glb': 'model/gltf-binary',
+}
 
 # -----------------------------
 # Action imports (safe)
@@ -33,9 +82,16 @@ action_modules = [
     'add_thread', 
     'bisect_plane',
     'setup_scene',
-    'polygon_shape'
+    'polygon_shape',
+    'export'
 ]
 
+# Optional decode_<action>(body, content_type, query) hooks for binary uploads
+action_decoders = {}
+
+# Optional validate_<action>(command) hooks, run on the HTTP thread before a command is queued
+action_validators = {}
+
 def safe_import_actions():
     funcs = {}
     actions_dir = os.path.join(os.path.dirname(__file__), 'actions')
@@ -47,73 +103,453 @@ def safe_import_actions():
             mod = importlib.import_module(module_name)
             func_name = f"execute_{module_name}"
             funcs[module_name] = getattr(mod, func_name)
-            print(f"[Blend-REST] Imported {func_name}")
+            if hasattr(mod, f"decode_{module_name}"):
+                action_decoders[module_name] = getattr(mod, f"decode_{module_name}")
+            if hasattr(mod, f"validate_{module_name}"):
+                action_validators[module_name] = getattr(mod, f"validate_{module_name}")
+            logger.debug("Imported %s", func_name)
         except Exception as e:
-            print(f"[Blend-REST] Warning: could not import {module_name}: {e}")
+            logger.warning("Could not import %s: %s", module_name, e)
             # fallback dummy function
-            funcs[module_name] = lambda cmd, name=module_name: print(f"[Blend-REST] Skipped {name}: {cmd}")
+            funcs[module_name] = lambda cmd, name=module_name: logger.warning("Skipped %s: %s", name, Truncated(cmd))
     return funcs
 
 action_funcs = safe_import_actions()
 
+# Resolved from the actions folder added to sys.path above
+import batch_cache
+import export
+import face_groups
+import history
+import mesh_buffers
+import scene_objects
+
+def validate_command(cmd):
+    """Check a command before it is queued and return it in the form its action expects.
+
+    Raises ValueError for unknown actions and whatever the action's validator
+    rejects. Validators may also convert parameters, e.g. polygon_shape turns
+    JSON vertex lists into NumPy arrays, so the main thread only does bpy work.
+    """
+    if not isinstance(cmd, dict):
+        raise ValueError("Expected a command object")
+    action = cmd.get("action")
+    if action not in action_funcs:
+        raise ValueError(f"Unknown action: {action}")
+    if not isinstance(cmd.get("params", {}), dict):
+        raise ValueError("params must be an object")
+    if action == "batch":
+        return dict(cmd, commands=validate_commands(cmd.get("commands")))
+    validator = action_validators.get(action)
+    try:
+        return validator(cmd) if validator else cmd
+    except TypeError as e:
+        # e.g. a number where a validator expects a list
+        raise ValueError(f"Invalid {action} command: {e}") from None
+
+def validate_commands(commands):
+    """validate_command for every step of a batch; errors name the step"""
+    if not isinstance(commands, list):
+        raise ValueError("Expected an array of command objects")
+    validated = []
+    for index, step in enumerate(commands):
+        try:
+            validated.append(validate_command(step))
+        except ValueError as e:
+            raise ValueError(f"Step {index}: {e}") from None
+    return validated
+
+def validate_timeout(value, default=WAIT_TIMEOUT, maximum=MAX_WAIT_TIMEOUT):
+    """A ``?timeout=`` string or JSON number as seconds between 0 and ``maximum``; raises ValueError otherwise"""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"timeout must be a number of seconds, got {value!r}")
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise ValueError(f"timeout must be a number of seconds, got {value!r}") from None
+    if not math.isfinite(seconds) or not 0 <= seconds <= maximum:
+        raise ValueError(f"timeout must be between 0 and {maximum:g} seconds, got {value!r}")
+    return seconds
+
+def run_command(cmd):
+    """Dispatch a single command to its action and return the action's result"""
+    action = cmd.get("action")
+    func = action_funcs.get(action)
+    if func is None:
+        raise ValueError(f"Unknown action: {action}")
+    return func(cmd)
+
+def execute_batch(cmd):
+    """Run an ordered list of commands back-to-back under a single undo step; returns ``{"steps": [...]}``"""
+    commands = cmd.get("commands", [])
+    stop_on_error = cmd.get("stop_on_error", True)
+    # Changes made before the batch get their own step, so undoing the batch undoes nothing else
+    history.push("Original")
+    if cmd.get("cache"):
+        # Identical recipes append the objects stored by an earlier run instead of rebuilding them
+        steps, cache = batch_cache.run_cached(commands, stop_on_error, run_steps)
+        history.push(f"Batch ({len(commands)} commands)")
+        return {"steps": steps, "cache": cache}
+    steps = run_steps(commands, stop_on_error)
+    history.push(f"Batch ({len(commands)} commands)")
+    return {"steps": steps}
+
+def run_steps(commands, stop_on_error=True):
+    """Run commands in order without recording undo steps, and report each one"""
+    steps = []
+    failed = False
+    with history.suspended():
+        for index, step in enumerate(commands):
+            action = step.get("action")
+            if failed:
+                steps.append({"index": index, "action": action, "status": "skipped"})
+                continue
+            try:
+                result = run_command(step)
+                if result is False:
+                    # Most actions report failures (e.g. a missing target) by returning False
+                    raise RuntimeError(f"{action} failed; see the server log for details")
+                steps.append({"index": index, "action": action, "status": "done", "result": result})
+            except Exception as e:
+                logger.warning("Batch step %d ('%s') failed: %s", index, action, e)
+                steps.append({"index": index, "action": action, "status": "error", "error": str(e)})
+                failed = stop_on_error
+    return steps
+
+action_funcs["batch"] = execute_batch
+
+# Latency histograms and counters for GET /v1/metrics, with one series per action
+metrics = Metrics(action_funcs)
+
+# -----------------------------
+# Scene snapshot for GET /v1/models
+# -----------------------------
+def describe_object(obj):
+    return {
+        "name": obj.name,
+        "type": obj.type,
+        "location": list(obj.location),
+        "rotation": list(obj.rotation_euler),
+        "dimensions": list(obj.dimensions)
+    }
+
+# Change feed for GET /v1/events: object deltas and completed jobs
+event_log = EventLog(capacity=10000)
+
+def publish_object_changes(added, modified, removed):
+    event_log.publish_many(
+        [("object.added", {"object": entry}) for entry in added] +
+        [("object.modified", {"object": entry}) for entry in modified] +
+        [("object.deleted", {"name": name}) for name in removed])
+
+# Published by the main thread; HTTP threads never touch bpy.data.objects for /v1/models
+scene_snapshots = SnapshotPublisher(describe_object, on_change=publish_object_changes)
+
+def command_targets(cmd):
+    """Names of the objects a command refers to, including the steps of a batch"""
+    names = set()
+    for source in (cmd, cmd.get("params")):
+        if not isinstance(source, dict):
+            continue
+        for key in ("target", "name"):
+            if isinstance(source.get(key), str):
+                names.add(source[key])
+        if isinstance(source.get("targets"), list):
+            names.update(n for n in source["targets"] if isinstance(n, str))
+    steps = cmd.get("commands")
+    for step in steps if isinstance(steps, list) else []:
+        if isinstance(step, dict):
+            names |= command_targets(step)
+    return names
+
 # -----------------------------
 # Blender REST handler
 # -----------------------------
 class BlenderRESTHandler:
-    def __init__(self, queue):
+    def __init__(self, queue, jobs):
         self.queue = queue
+        self.jobs = jobs
 
-    def handle_request(self, command):
-        self.queue.put(command)
-        return {"status": "queued"}
+    def handle_request(self, command, wait=False, timeout=WAIT_TIMEOUT, session=None):
+        job = Job(command, session=session)
+        self.jobs.add(job)
+        self.queue.put(job)
+        if wait:
+            # The HTTP worker is not counted against the pool while it waits
+            with blocking():
+                job.wait(timeout)
+        return job.to_dict()
+
+    def call_in_main_thread(self, func, *args, timeout=WAIT_TIMEOUT):
+        """Run ``func(*args)`` on Blender's main thread and return its result (not recorded as a job)"""
+        job = Job({"action": func.__name__}, func=lambda command: func(*args), tracked=False)
+        self.queue.put(job)
+        with blocking():
+            return job.future.result(timeout=timeout)
+
+    def handle_batch(self, commands, stop_on_error=True, timeout=WAIT_TIMEOUT, session=None, cache=False,
+                     profile=False):
+        # A batch is a single queue item, so no other command can interleave with it
+        batch = {"action": "batch", "commands": commands, "stop_on_error": stop_on_error, "cache": cache,
+                 "profile": profile}
+        result = self.handle_request(batch, wait=True, timeout=timeout, session=session)
+        if isinstance(result.get("result"), dict):
+            # The steps (and for cached batches what the cache did) go to the top level
+            result.update(result.pop("result"))
+        return result
 
 # -----------------------------
 # REST server
 # -----------------------------
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that runs requests on a bounded pool of worker threads.
+
+    Connections waiting for their next request are watched by a selector
+    instead of holding a worker, so idle keep-alive clients cost no thread;
+    a worker only takes a connection once a request has arrived on it.
+    Idle connections are closed after ``keepalive_timeout`` seconds.
+    """
+    request_queue_size = 64
+
+    def __init__(self, server_address, handler_class, workers=8, keepalive_timeout=15.0):
+        super().__init__(server_address, handler_class)
+        self.pool = WorkerPool(workers, name="blend-rest-http")
+        self.keepalive_timeout = keepalive_timeout
+        self._connections = set()  # every open connection's handler, for server_close()
+        self._parked = []  # handlers handed back by workers, registered by the selector thread
+        self._woken = False  # a wakeup byte is on its way, so parking needs no other
+        self._lock = threading.Lock()
+        self._closing = False
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._wakeup_writer = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._watcher = threading.Thread(target=self._watch, name="blend-rest-http-selector", daemon=True)
+        self._watcher.start()
+
+    def process_request(self, request, client_address):
+        # One handler lives as long as its connection: setup() wraps the socket once
+        # and handle_one_request() runs for every request that arrives on it
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.request, handler.client_address, handler.server = request, client_address, self
+        handler.setup()
+        with self._lock:
+            self._connections.add(handler)
+        self._park(handler)
+
+    def _serve(self, handler):
+        """Answer one request on a worker, then hand the connection back to the selector"""
+        try:
+            handler.close_connection = True
+            handler.handle_one_request()
+            if not handler.close_connection and not self._closing:
+                if self._buffered(handler):
+                    # A pipelined request was read along with the last one; the selector would not see it
+                    self.pool.submit(self._serve, handler)
+                else:
+                    self._park(handler)
+                return
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+        self._close(handler)
+
+    def _buffered(self, handler):
+        handler.request.settimeout(0)
+        try:
+            return bool(handler.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            handler.request.settimeout(handler.timeout)
+
+    def _park(self, handler):
+        handler.idle_since = time.monotonic()
+        with self._lock:
+            closing = self._closing
+            if not closing:
+                self._parked.append(handler)
+                wake, self._woken = not self._woken, True
+        if closing:
+            self._close(handler)
+        elif wake:
+            try:
+                self._wakeup_writer.send(b"\0")
+            except OSError:
+                pass
+
+    def _watch(self):
+        next_expiry = time.monotonic() + 1.0
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.fileobj is self._wakeup:
+                    try:
+                        self._wakeup.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                self.pool.submit(self._serve, key.data)
+            with self._lock:
+                parked, self._parked = self._parked, []
+                self._woken = False
+            for handler in parked:
+                try:
+                    self._selector.register(handler.request, selectors.EVENT_READ, handler)
+                except (OSError, ValueError):
+                    self._close(handler)
+            now = time.monotonic()
+            if now >= next_expiry:
+                next_expiry = now + 1.0
+                for key in list(self._selector.get_map().values()):
+                    if key.data is not None and now - key.data.idle_since > self.keepalive_timeout:
+                        self._selector.unregister(key.fileobj)
+                        self._close(key.data)
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._close(key.data)
+        self._selector.close()
+
+    def _close(self, handler):
+        try:
+            handler.finish()
+        except Exception:
+            pass
+        with self._lock:
+            self._connections.discard(handler)
+        self.shutdown_request(handler.request)
+
+    def server_close(self):
+        super().server_close()
+        with self._lock:
+            self._closing = True
+            # Wake workers blocked on a request or an event stream so they can exit
+            for handler in self._connections:
+                try:
+                    handler.request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        try:
+            self._wakeup_writer.send(b"\0")
+        except OSError:
+            pass
+        self._watcher.join()
+        self._wakeup.close()
+        self._wakeup_writer.close()
+        self.pool.shutdown()
+
 class BlendRESTServer:
     def __init__(self):
         self.server = None
-        self.handler = BlenderRESTHandler(command_queue)
+        self.handler = BlenderRESTHandler(command_queue, job_store)
         self.is_running = False
 
-    def start_server(self, port=8000):
+    def start_server(self, port=8000, host='127.0.0.1', threaded=True, workers=8,
+                     max_body_bytes=MAX_BODY_BYTES, keepalive_timeout=15.0):
+        """Start serving; threaded mode adds HTTP/1.1 keep-alive and a pool of ``workers`` threads"""
         if self.is_running:
             return {"status": "already running"}
         try:
-            self.server = HTTPServer(('127.0.0.1', port), self._create_http_handler())
+            handler_class = self._create_http_handler(max_body_bytes)
+            if threaded:
+                handler_class.protocol_version = "HTTP/1.1"
+                # Idle keep-alive connections are closed, and stalled requests time out, after this many seconds
+                handler_class.timeout = keepalive_timeout
+                self.server = PooledHTTPServer((host, port), handler_class, workers=workers,
+                                               keepalive_timeout=keepalive_timeout)
+            else:
+                self.server = HTTPServer((host, port), handler_class)
             self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.server_thread.start()
             self.is_running = True
-            print(f"[Blend-REST] Server started on port {port}")
-            return {"status": "started", "port": port}
+            logger.info("Server started on %s:%s%s", host, self.server.server_address[1],
+                        f" with {workers} workers" if threaded else "")
+            return {"status": "started", "host": host, "port": port}
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
     def stop_server(self):
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.server = None
             self.is_running = False
-            print("[Blend-REST] Server stopped")
+            logger.info("Server stopped")
         return {"status": "stopped"}
 
-    def _create_http_handler(self):
+    def _create_http_handler(self, max_body_bytes=MAX_BODY_BYTES):
         handler_instance = self.handler  # capture for closure
+        server_instance = self
 
         class CustomHTTPHandler(BaseHTTPRequestHandler):
+            # Headers and body go out in separate writes; with Nagle's algorithm on, a
+            # keep-alive client's delayed ACK would hold every small body back ~40 ms
+            disable_nagle_algorithm = True
+
             def do_GET(self):
                 try:
-                    if self.path == '/v1/models':
-                        objects = [{
-                            "name": obj.name,
-                            "type": obj.type,
-                            "location": list(obj.location),
-                            "rotation": list(obj.rotation_euler),
-                            "dimensions": list(obj.dimensions)
-                        } for obj in bpy.data.objects]
-                        self._send_json(objects)
-                    elif self.path == '/v1/status':
-                        self._send_json({"status": "ready", "objects": len(bpy.data.objects)})
+                    url = urlsplit(self.path)
+                    query = parse_qs(url.query)
+                    if url.path == '/v1/jobs':
+                        try:
+                            since = self._int(query, 'since', 0)
+                            limit = self._int(query, 'limit', 100)
+                        except ValueError as e:
+                            self._send_json({"error": str(e)}, 400)
+                            return
+                        jobs = [job.to_dict() for job in handler_instance.jobs.since(since, limit)]
+                        last_id = jobs[-1]["job_id"] if jobs else since
+                        self._send_json({"jobs": jobs, "last_id": last_id})
+                    elif url.path.startswith('/v1/jobs/') and url.path.endswith('/profile'):
+                        self._send_profile(url.path[len('/v1/jobs/'):-len('/profile')])
+                    elif url.path.startswith('/v1/jobs/'):
+                        job_id = url.path[len('/v1/jobs/'):]
+                        job = handler_instance.jobs.get(int(job_id)) if job_id.isdigit() else None
+                        if job is None:
+                            self._send_json({"error": f"Job '{job_id}' not found"}, 404)
+                        else:
+                            self._send_json(job.to_dict())
+                    elif url.path == '/v1/events':
+                        if 'text/event-stream' in self.headers.get('Accept', '') or 'stream' in query:
+                            self._stream_events(query)
+                        else:
+                            try:
+                                since = self._int(query, 'since', event_log.last_seq)
+                                timeout = min(validate_timeout(query.get('timeout', [None])[0], 25.0, math.inf), EVENTS_TIMEOUT)
+                            except ValueError as e:
+                                self._send_json({"error": str(e)}, 400)
+                                return
+                            with blocking():
+                                events, last_seq, truncated = event_log.since(since, timeout)
+                            self._send_json({"events": events, "last_seq": last_seq, "truncated": truncated})
+                    elif url.path.startswith('/v1/models/') and url.path.endswith('/mesh'):
+                        self._send_mesh(unquote(url.path[len('/v1/models/'):-len('/mesh')]), query)
+                    elif url.path.startswith('/v1/models/') and url.path.endswith('/face_groups'):
+                        self._send_face_groups(unquote(url.path[len('/v1/models/'):-len('/face_groups')]), query)
+                    elif url.path == '/v1/models':
+                        snapshot = scene_snapshots.current
+                        if self._etag_matches(snapshot.etag):
+                            self._send_not_modified(snapshot.etag)
+                        elif query:
+                            self._send_model_query(snapshot, query)
+                        else:
+                            self._send_body(snapshot.body, 'application/json', etag=snapshot.etag)
+                    elif url.path == '/v1/files':
+                        self._send_json({"files": export.list_files()})
+                    elif url.path.startswith('/v1/files/'):
+                        self._send_file(url.path[len('/v1/files/'):])
+                    elif url.path == '/v1/sessions':
+                        depths = command_queue.depths()
+                        self._send_json({"sessions": handler_instance.call_in_main_thread(list_sessions, depths)})
+                    elif url.path == '/v1/metrics':
+                        self._send_metrics()
+                    elif url.path == '/v1/status':
+                        self._send_json({
+                            "status": "ready",
+                            "objects": len(scene_snapshots.current.objects),
+                            "scheduler": scheduler.stats(),
+                        })
                     else:
                         self._send_json({"error": "Endpoint not found"}, 404)
                 except Exception as e:
@@ -121,30 +557,371 @@ class BlendRESTServer:
 
             def do_POST(self):
                 try:
-                    if self.path == '/v1/commands':
-                        content_length = int(self.headers.get('Content-Length', 0))
-                        post_data = self.rfile.read(content_length)
-                        command = json.loads(post_data.decode())
-                        print(f"[Blend-REST] Received command: {command}")
-                        result = handler_instance.handle_request(command)
-                        self._send_json(result)
+                    url = urlsplit(self.path)
+                    query = parse_qs(url.query)
+                    if url.path == '/v1/commands':
+                        post_data = self._read_body()
+                        if post_data is None:
+                            return
+                        try:
+                            command = validate_command(json.loads(post_data.decode()))
+                            timeout = validate_timeout(query.get('timeout', [None])[0])
+                        except ValueError as e:
+                            self._send_json({"error": str(e)}, 400)
+                            return
+                        session = self._session(command)
+                        if session is False:
+                            return
+                        logger.debug("Received command: %s", Truncated(command))
+                        wait = self._flag(query, 'wait')
+                        result = handler_instance.handle_request(command, wait=wait, timeout=timeout, session=session)
+                        self._send_json(result, self._status_code(result, wait))
+                    elif url.path == '/v1/commands/batch':
+                        post_data = self._read_body()
+                        if post_data is None:
+                            return
+                        try:
+                            body = json.loads(post_data.decode())
+                            if isinstance(body, list):
+                                body = {"commands": body}
+                            commands = validate_commands(body.get("commands") if isinstance(body, dict) else None)
+                            timeout = validate_timeout(body.get("timeout"))
+                        except ValueError as e:
+                            self._send_json({"error": str(e)}, 400)
+                            return
+                        session = self._session({"commands": commands})
+                        if session is False:
+                            return
+                        logger.debug("Received batch of %d commands", len(commands))
+                        result = handler_instance.handle_batch(
+                            commands,
+                            stop_on_error=body.get("stop_on_error", True),
+                            timeout=timeout,
+                            session=session,
+                            cache=bool(body.get("cache", False)),
+                            profile=bool(body.get("profile", False)))
+                        self._send_json(result, self._status_code(result, True))
+                    elif url.path.startswith('/v1/commands/'):
+                        action = url.path[len('/v1/commands/'):]
+                        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+                        decoder = action_decoders.get(action)
+                        if action not in action_funcs:
+                            # The body was not consumed, so the connection cannot be reused
+                            self.close_connection = True
+                            self._send_json({"error": f"Unknown action: {action}"}, 404)
+                            return
+                        if decoder is None or content_type == 'application/json':
+                            self.close_connection = True
+                            self._send_json({"error": f"Binary uploads are not supported for '{action}'"}, 415)
+                            return
+                        post_data = self._read_body()
+                        if post_data is None:
+                            return
+                        try:
+                            # A truncated or corrupt archive fails inside np.load with any of these
+                            try:
+                                decoded = decoder(post_data, content_type, query)
+                            except (OSError, EOFError, zipfile.BadZipFile) as e:
+                                raise ValueError(e) from None
+                            command = validate_command(decoded)
+                            timeout = validate_timeout(query.get('timeout', [None])[0])
+                        except (ValueError, KeyError) as e:
+                            self._send_json({"error": f"Invalid {action} upload: {e}"}, 400)
+                            return
+                        session = self._session(command)
+                        if session is False:
+                            return
+                        logger.debug("Received %d byte %s upload", len(post_data), action)
+                        wait = self._flag(query, 'wait')
+                        result = handler_instance.handle_request(command, wait=wait, timeout=timeout, session=session)
+                        self._send_json(result, self._status_code(result, wait))
+                    else:
+                        # The body was not consumed, so the connection cannot be reused
+                        self.close_connection = True
+                        self._send_json({"error": "Endpoint not found"}, 404)
+                except Exception as e:
+                    self.close_connection = True
+                    logger.exception("POST %s failed: %s", self.path, e)
+                    self._send_json({"error": str(e)}, 500)
+
+            def do_DELETE(self):
+                try:
+                    url = urlsplit(self.path)
+                    if url.path.startswith('/v1/sessions/'):
+                        session = unquote(url.path[len('/v1/sessions/'):])
+                        try:
+                            self._send_json(handler_instance.call_in_main_thread(delete_session, session))
+                        except LookupError as e:
+                            self._send_json({"error": str(e)}, 404)
+                        except ValueError as e:
+                            self._send_json({"error": str(e)}, 409)
                     else:
                         self._send_json({"error": "Endpoint not found"}, 404)
                 except Exception as e:
-                    import traceback
-                    print(f"[Blend-REST] POST error: {e}")
-                    print(f"[Blend-REST] POST traceback: {traceback.format_exc()}")
+                    self.close_connection = True
                     self._send_json({"error": str(e)}, 500)
 
             def log_message(self, format, *args):
                 # suppress default HTTP server logging
                 return
 
+            def parse_request(self):
+                # Timed from here so keep-alive connections idling between requests don't count
+                self._request_started = time.perf_counter()
+                self._response_code = None
+                return super().parse_request()
+
+            def send_response(self, code, message=None):
+                self._response_code = code
+                super().send_response(code, message)
+
+            def handle_one_request(self):
+                self._request_started = None
+                super().handle_one_request()
+                if self._request_started is not None and self._response_code is not None:
+                    metrics.observe_http(self.command, self.path, self._response_code,
+                                         time.perf_counter() - self._request_started)
+
+            def _session(self, command):
+                """The request's session id, None without one, or False after answering 400"""
+                session = self.headers.get(SESSION_HEADER)
+                if session is None:
+                    return None
+                if not valid_session_id(session):
+                    self._send_json({"error": f"{SESSION_HEADER} must be 1-48 letters, digits, '_', '.' or '-'"}, 400)
+                    return False
+                if uses_global_actions(command):
+                    self._send_json({"error": "undo and redo act on Blender's global history and are not available in sessions"}, 400)
+                    return False
+                return session
+
+            def _int(self, query, key, default, minimum=0):
+                """An integer query parameter; raises ValueError if it is malformed or below ``minimum``"""
+                if key not in query:
+                    return default
+                value = query[key][0]
+                if not re.fullmatch(r'-?\d+', value) or int(value) < minimum:
+                    raise ValueError(f"{key} must be an integer of at least {minimum}, got '{value}'")
+                return int(value)
+
+            def _flag(self, query, key, default=False):
+                if key not in query:
+                    return default
+                return query[key][0].lower() in ('1', 'true', 'yes')
+
+            def _send_mesh(self, name, query):
+                fmt = query.get('format', ['npz'])[0]
+                if fmt not in ('npz', 'raw'):
+                    self._send_json({"error": f"Unknown format '{fmt}', expected npz or raw"}, 400)
+                    return
+                space = query.get('space', ['local'])[0]
+                if space not in ('local', 'world'):
+                    self._send_json({"error": f"Unknown space '{space}', expected local or world"}, 400)
+                    return
+                try:
+                    # Only the foreach_get copies run on the main thread; encoding happens here
+                    buffers = handler_instance.call_in_main_thread(
+                        mesh_buffers.read_mesh_buffers, name,
+                        self._flag(query, 'evaluated'), space == 'world', self._flag(query, 'normals', True))
+                except scene_objects.ObjectNotFound as e:
+                    self._send_json({"error": str(e)}, 404)
+                    return
+                except ValueError as e:
+                    self._send_json({"error": str(e)}, 400)
+                    return
+                if fmt == 'raw':
+                    body, headers = mesh_buffers.encode_raw(buffers)
+                    self._send_body(body, 'application/octet-stream', headers=headers)
+                else:
+                    body = mesh_buffers.encode_npz(buffers, compressed=self._flag(query, 'compressed'))
+                    self._send_body(body, 'application/x-npz')
+
+            def _send_face_groups(self, name, query):
+                try:
+                    groups = handler_instance.call_in_main_thread(
+                        face_groups.describe_face_groups, name, self._flag(query, 'faces'))
+                except scene_objects.ObjectNotFound as e:
+                    self._send_json({"error": str(e)}, 404)
+                    return
+                except ValueError as e:
+                    self._send_json({"error": str(e)}, 400)
+                    return
+                self._send_json(groups)
+
+            def _send_file(self, file_id):
+                """Stream a finished export in chunks; supports a single ``Range: bytes=`` range"""
+                info = export.file_info(file_id)
+                if info is None:
+                    self._send_json({"error": f"File '{file_id}' not found"}, 404)
+                    return
+                if info["status"] != "ready":
+                    self._send_json(info, 202 if info["status"] == "writing" else 500)
+                    return
+                size = info["size"]
+                start, end = 0, size - 1
+                match = re.fullmatch(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+                partial = bool(match and (match.group(1) or match.group(2)))
+                if partial:
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                    else:
+                        start = max(0, size - int(match.group(2)))
+                    if start > end:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                with open(info["path"], 'rb') as f:
+                    self.send_response(206 if partial else 200)
+                    self.send_header('Content-type', FILE_CONTENT_TYPES[file_id.rsplit('.', 1)[1]])
+                    self.send_header('Content-Length', str(end - start + 1))
+                    self.send_header('Content-Disposition', f'attachment; filename="{file_id}"')
+                    self.send_header('Accept-Ranges', 'bytes')
+                    if partial:
+                        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                    self.end_headers()
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = f.read(min(FILE_CHUNK_BYTES, remaining))
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
+
+            def _stream_events(self, query):
+                """Serve the change feed as Server-Sent Events until the client disconnects"""
+                # Checked before the headers go out; a failure after them could no longer answer 400
+                try:
+                    last_event_id = self.headers.get('Last-Event-ID')
+                    if last_event_id:
+                        since = self._int({'Last-Event-ID': [last_event_id.strip()]}, 'Last-Event-ID', 0)
+                    else:
+                        since = self._int(query, 'since', event_log.last_seq)
+                except ValueError as e:
+                    self._send_json({"error": str(e)}, 400)
+                    return
+                # The stream has no length, so this connection cannot be kept alive afterwards
+                self.close_connection = True
+                self.send_response(200)
+                self.send_header('Content-type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                try:
+                    # A stream can last for hours, so it does not count against the worker pool
+                    with blocking():
+                        while server_instance.is_running:
+                            events, since, truncated = event_log.since(since, SSE_HEARTBEAT)
+                            if truncated:
+                                self.wfile.write(b"event: truncated\ndata: {}\n\n")
+                            for event in events:
+                                self.wfile.write(
+                                    f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n".encode())
+                            if not events:
+                                self.wfile.write(b": keep-alive\n\n")
+                            self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError, OSError):
+                    pass
+
+            def _send_model_query(self, snapshot, query):
+                fields = None
+                if 'fields' in query:
+                    fields = [f for f in query['fields'][0].split(',') if f]
+                    unknown = [f for f in fields if f not in OBJECT_FIELDS]
+                    if unknown:
+                        self._send_json({"error": f"Unknown fields: {', '.join(unknown)}"}, 400)
+                        return
+                paginated = 'limit' in query or 'cursor' in query
+                try:
+                    limit = int(query.get('limit', [MODELS_PAGE_LIMIT])[0]) if paginated else None
+                    if limit is not None and not 0 < limit <= MODELS_PAGE_LIMIT:
+                        raise ValueError(f"limit must be between 1 and {MODELS_PAGE_LIMIT}")
+                    objects, next_cursor = snapshot.query(
+                        type=query.get('type', [None])[0],
+                        name_prefix=query.get('name_prefix', [None])[0],
+                        fields=fields,
+                        limit=limit,
+                        cursor=query.get('cursor', [None])[0])
+                except ValueError as e:
+                    self._send_json({"error": f"Invalid query: {e}"}, 400)
+                    return
+                data = {"objects": objects, "next_cursor": next_cursor} if paginated else objects
+                self._send_body(json.dumps(data).encode(), 'application/json', etag=snapshot.etag)
+
+            def _read_body(self):
+                """Read the request body, answering 413 and returning None when it is too large"""
+                content_length = int(self.headers.get('Content-Length', 0))
+                if content_length > max_body_bytes:
+                    self.close_connection = True
+                    self._send_json({"error": f"Request body exceeds {max_body_bytes} bytes"}, 413)
+                    return None
+                return self.rfile.read(content_length)
+
+            def _status_code(self, result, waited):
+                if not waited:
+                    return 200
+                # 202 tells a waiting client the job is still queued or running
+                return {"done": 200, "failed": 500}.get(result["status"], 202)
+
+            def _etag_matches(self, etag):
+                if_none_match = self.headers.get('If-None-Match')
+                if not if_none_match:
+                    return False
+                return if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]
+
+            def _send_not_modified(self, etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+
+            def _send_profile(self, job_id):
+                job = handler_instance.jobs.get(int(job_id)) if job_id.isdigit() else None
+                if job is None or not (job.profile or {}).get("url"):
+                    self._send_json({"error": f"No profile for job '{job_id}'"}, 404)
+                    return
+                try:
+                    with open(profiling.profile_path(job.id), 'rb') as f:
+                        body = f.read()
+                except FileNotFoundError:
+                    self._send_json({"error": f"Profile of job '{job_id}' was deleted"}, 404)
+                    return
+                self._send_body(body, 'application/octet-stream', headers={
+                    'Content-Disposition': f'attachment; filename="job-{job.id}.prof"'})
+
+            def _send_metrics(self):
+                depths = command_queue.depths()
+                stats = scheduler.stats()
+                body = metrics.render({
+                    "blend_rest_queue_depth": ("Commands waiting in the queue", sum(depths.values())),
+                    "blend_rest_queued_sessions": ("Sessions with queued commands", len(depths)),
+                    "blend_rest_jobs_run": ("Commands run by the scheduler since startup", stats["jobs_run"]),
+                    "blend_rest_tick_interval_seconds": ("Current delay between timer ticks", stats["interval"]),
+                    "blend_rest_objects": ("Objects in the scene snapshot", len(scene_snapshots.current.objects)),
+                    "blend_rest_tracked_jobs": ("Jobs retained for GET /v1/jobs", len(job_store)),
+                }).encode()
+                self._send_body(body, METRICS_CONTENT_TYPE)
+
             def _send_json(self, data, code=200):
+                # Serialize first so an unserializable action result cannot break a sent header
+                body = json.dumps(data, default=str).encode()
+                self._send_body(body, 'application/json', code)
+
+            def _send_body(self, body, content_type, code=200, etag=None, headers=None):
                 self.send_response(code)
-                self.send_header('Content-type', 'application/json')
+                self.send_header('Content-type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, str(value))
+                if etag:
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', 'no-cache')
+                if self.close_connection:
+                    self.send_header('Connection', 'close')
                 self.end_headers()
-                self.wfile.write(json.dumps(data).encode())
+                self.wfile.write(body)
 
         return CustomHTTPHandler
 
@@ -191,18 +968,83 @@ class BlendRESTPanel(bpy.types.Panel):
 # -----------------------------
 # Timer: process queued commands
 # -----------------------------
+# Jobs executed in the current tick, resolved once the scene snapshot reflects them
+completed_jobs = []
+
+def execute_job(job):
+    command = job.command
+    job.start()
+    result = error = None
+    dirty = set()
+    try:
+        # Target names only resolve to the session's own objects
+        with session_scope(job.session) as scene, scene_objects.restricted(scene):
+            try:
+                if job.tracked and profiling.wanted(command):
+                    result = profiling.profile_call(job, job.func or run_command, command)
+                else:
+                    result = (job.func or run_command)(command)
+            finally:
+                # The active object is the session view layer's, so it is read before the scope ends
+                if job.tracked:
+                    dirty = command_dirty_names(command)
+    except Exception as e:
+        logger.exception("Error executing action '%s': %s", job.action, e)
+        error = e
+    finished_at = time.time()
+    completed_jobs.append((job, result, error, finished_at))
+    # Internal main-thread calls are not REST actions and are counted as "other"
+    metrics.observe_job(job.action, job.started_at - job.queued_at, finished_at - job.started_at, error is not None)
+    if dirty is None:
+        scene_snapshots.mark_all_dirty()
+    else:
+        scene_snapshots.mark_dirty(dirty)
+
+def command_dirty_names(cmd):
+    """Names of the objects a finished command may have changed, or None if it may have changed any"""
+    if cmd.get("action") in ("undo", "redo"):
+        return None
+    names = command_targets(cmd)
+    active = getattr(bpy.context, "active_object", None)
+    if active is not None:
+        names.add(active.name)
+    return names
+
+def delete_session(session):
+    """remove_session, then drop the deleted objects from the next snapshot (runs on the main thread)"""
+    result = remove_session(session)
+    scene_snapshots.mark_all_dirty()
+    return result
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update(scene, depsgraph):
+    scene_snapshots.mark_dirty(update.id.name for update in depsgraph.updates
+                               if isinstance(update.id, bpy.types.Object))
+
+@bpy.app.handlers.persistent
+def on_load_post(*args):
+    scene_snapshots.mark_all_dirty()
+    face_groups.clear()
+
+# Up to 20 ms of commands per timer tick keeps the UI responsive during bursts
+scheduler = CommandScheduler(command_queue, execute_job, budget=0.02)
+
 def process_commands():
-    while not command_queue.empty():
-        cmd = command_queue.get()
-        action = cmd.get("action")
-        func = action_funcs.get(action, lambda c: print(f"[Blend-REST] Unknown action: {c}"))
-        try:
-            func(cmd)
-        except Exception as e:
-            import traceback
-            print(f"[Blend-REST] Error executing action '{action}': {e}")
-            print(f"[Blend-REST] Traceback: {traceback.format_exc()}")
-    return 0.1
+    started = time.perf_counter()
+    interval = scheduler.tick()
+    scene_snapshots.refresh(bpy.data.objects)
+    # Resolving after the refresh lets ?wait=true clients read their own writes from /v1/models
+    for job, result, error, finished_at in completed_jobs:
+        if error is None:
+            job.finish(result, finished_at)
+        else:
+            job.fail(error, finished_at)
+    if completed_jobs:
+        event_log.publish_many([(f"job.{job.status}", {"job": job.to_dict()})
+                                for job, *_ in completed_jobs if job.tracked])
+    metrics.observe_tick(time.perf_counter() - started, bool(completed_jobs))
+    completed_jobs.clear()
+    return interval
 
 # -----------------------------
 # Global server instance
@@ -213,11 +1055,16 @@ rest_server = None
 # Registration
 # -----------------------------
 def register():
+    log.configure()
     bpy.utils.register_class(StartServerOperator)
     bpy.utils.register_class(StopServerOperator)
     bpy.utils.register_class(BlendRESTPanel)
     if not bpy.app.timers.is_registered(process_commands):
         bpy.app.timers.register(process_commands)
+    if on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    if on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(on_load_post)
 
 def unregister():
     bpy.utils.unregister_class(StartServerOperator)
@@ -227,6 +1074,11 @@ def unregister():
         rest_server.stop_server()
     if bpy.app.timers.is_registered(process_commands):
         bpy.app.timers.unregister(process_commands)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    log.shutdown()
 
 if __name__ == "__main__":
     register()
@@ -1,8 +1,14 @@
 import bpy
+import history
+import logging
+import primitives
+import scene_objects
+
+logger = logging.getLogger("blend_rest.add_thread")
 
 def execute_add_thread(cmd):
     """Add thread using MACHIN3tools plugin"""
-    bpy.ops.ed.undo_push(message="Original")
+    history.push("Original")
     # Add thread using MACHIN3tools plugin
     thread_params = cmd.get("params", {})
     target_object = thread_params.get("target")  # Object to apply thread to
@@ -19,16 +25,16 @@ def execute_add_thread(cmd):
     flip = thread_params.get("flip", False)  # Flip thread direction
     
     # Get the target object
-    obj = bpy.data.objects.get(target_object)
+    obj = scene_objects.get(target_object)
     if not obj:
-        print(f"Error: Object '{target_object}' not found")
+        logger.error("Object '%s' not found", target_object)
         return False
         
     # Position the 3D cursor
     bpy.context.scene.cursor.location = position
     
     # Use select_faces action to select side faces first
-    bpy.ops.ed.undo_push(message="Selected side faces")
+    history.push("Selected side faces")
     
     # Create the thread using MACHIN3tools operator
     try:
@@ -44,13 +50,30 @@ def execute_add_thread(cmd):
             h4=h4,
             flip=flip
         )
-        print(f"Thread created on '{target_object}' at position {position}")
+        logger.debug("Thread created on '%s' at position %s", target_object, position)
     except Exception as e:
-        print(f"Error adding thread: {e}")
+        logger.error("Could not add thread: %s", e)
         return False
     finally:
         # Return to object mode
         bpy.ops.object.mode_set(mode='OBJECT')
     
-    bpy.ops.ed.undo_push(message="Added thread")
+    history.push("Added thread")
     return True
+
+def validate_add_thread(cmd):
+    """Check the target, cursor position and thread dimensions before the command is queued (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    if not isinstance(p.get("target"), str):
+        raise ValueError("target must be an object name")
+    if "position" in p:
+        p["position"] = primitives.vector3(p["position"], "position")
+    for key in ("segments", "loops"):
+        if key in p:
+            p[key] = primitives.number(p[key], key, integer=True, minimum=1)
+    for key in ("radius", "depth", "fade", "h1", "h2", "h3", "h4"):
+        if key in p:
+            p[key] = primitives.number(p[key], key, minimum=0)
+    if not isinstance(p.get("flip", False), bool):
+        raise ValueError("flip must be true or false")
+    return dict(cmd, params=p)
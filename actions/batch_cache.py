@@ -0,0 +1,196 @@
+import bpy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import numpy as np
+
+logger = logging.getLogger("blend_rest.batch_cache")
+
+# Where cached batch results are kept; set BLEND_REST_CACHE_DIR to change it (workers may share one)
+CACHE_DIR = os.environ.get("BLEND_REST_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "blend-rest-cache")
+
+# Total size the cache may grow to before the least recently used entries are deleted
+MAX_CACHE_BYTES = int(os.environ.get("BLEND_REST_CACHE_BYTES") or 1024 * 1024 * 1024)
+
+# Bumped when the entry layout changes so old entries are never read
+CACHE_FORMAT = 1
+
+# Actions whose effect is not carried by the cached objects; they are cheap and run again on a hit
+REPLAY_ACTIONS = ("setup_scene",)
+
+# Actions whose effect lies outside the objects a batch creates, so a batch using them is never cached
+UNCACHEABLE_ACTIONS = ("undo", "redo", "export")
+
+def batch_key(commands, stop_on_error):
+    """Content hash of a normalized batch; identical recipes get the same key"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((CACHE_FORMAT, tuple(bpy.app.version), bool(stop_on_error))).encode())
+    digest.update(json.dumps(commands, sort_keys=True, separators=(",", ":"), default=_array_key).encode())
+    return digest.hexdigest()
+
+def _array_key(value):
+    # Validated commands carry NumPy arrays, e.g. polygon_shape vertices
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return [str(data.dtype), data.shape, hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()]
+    raise TypeError(f"Cannot hash {type(value).__name__} in a batch")
+
+def run_cached(commands, stop_on_error, run_steps):
+    """Run a batch through the cache.
+
+    ``run_steps(commands, stop_on_error)`` runs commands the normal way. Returns the steps
+    and a dict describing what the cache did (``hit``, ``miss`` or ``bypass``).
+    """
+    key = batch_key(commands, stop_on_error)
+    info = {"key": key}
+
+    # Only batches that build new objects from nothing give the same result in every scene
+    reason = _uncacheable(commands)
+    if reason:
+        info.update(status="bypass", reason=reason)
+        return run_steps(commands, stop_on_error), info
+
+    blend_path, meta_path = _paths(key)
+    meta = _load_meta(meta_path) if os.path.exists(blend_path) else None
+    if meta is not None:
+        taken = [name for name in meta["objects"] if name in bpy.data.objects]
+        if taken:
+            info.update(status="bypass", reason=f"Objects already exist: {', '.join(taken)}")
+            return run_steps(commands, stop_on_error), info
+        try:
+            replayed = run_steps([c for c in commands if c.get("action") in REPLAY_ACTIONS], True)
+            objects = _append(blend_path, meta["objects"])
+        except Exception as e:
+            logger.warning("Dropping unreadable entry %s: %s", key, e)
+            _remove(key)
+        else:
+            _touch(key)
+            info.update(status="hit", objects=[obj.name for obj in objects])
+            logger.debug("Hit %s: appended %d objects", key, len(objects))
+            return _merge_steps(meta["steps"], replayed), info
+
+    before = set(bpy.data.objects)
+    steps = run_steps(commands, stop_on_error)
+    created = [obj for obj in bpy.data.objects if obj not in before]
+    if not all(step["status"] == "done" for step in steps):
+        info.update(status="bypass", reason="Batch did not complete")
+    elif not created:
+        info.update(status="bypass", reason="Batch created no objects")
+    else:
+        _store(key, created, steps)
+        info.update(status="miss", objects=[obj.name for obj in created])
+    return steps, info
+
+def _uncacheable(commands):
+    names = set()
+    for command in commands:
+        action = command.get("action")
+        if action == "batch" or action in UNCACHEABLE_ACTIONS:
+            return f"Action '{action}' cannot be cached"
+        _collect_targets(command, names)
+    existing = sorted(name for name in names if name in bpy.data.objects)
+    if existing:
+        # The result would depend on objects made before the batch
+        return f"Batch uses existing objects: {', '.join(existing)}"
+    return None
+
+def _collect_targets(value, names):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("target", "targets"):
+                names.update([item] if isinstance(item, str) else [n for n in item or [] if isinstance(n, str)])
+            else:
+                _collect_targets(item, names)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_targets(item, names)
+
+def _merge_steps(cached_steps, replayed):
+    """The recorded steps of the batch, with the results of the actions that ran again"""
+    replayed = iter(replayed)
+    steps = []
+    for step in cached_steps:
+        if step["action"] in REPLAY_ACTIONS:
+            step = dict(next(replayed), index=step["index"])
+        steps.append(dict(step, cached=step["action"] not in REPLAY_ACTIONS))
+    return steps
+
+def _append(blend_path, names):
+    """Append the named objects (and the data they use) from a cached .blend to the current collection"""
+    with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+        missing = [name for name in names if name not in data_from.objects]
+        if missing:
+            raise ValueError(f"Objects missing from cache entry: {', '.join(missing)}")
+        data_to.objects = list(names)
+    collection = bpy.context.collection
+    for obj in data_to.objects:
+        collection.objects.link(obj)
+    return data_to.objects
+
+def _store(key, objects, steps):
+    blend_path, meta_path = _paths(key)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Written under temporary names and renamed, so other workers never read half an entry
+    suffix = f".{os.getpid()}.tmp"
+    try:
+        bpy.data.libraries.write(blend_path + suffix, set(objects), compress=True)
+        with open(meta_path + suffix, "w") as f:
+            json.dump({"objects": [obj.name for obj in objects], "steps": steps, "created": time.time()}, f)
+        os.replace(blend_path + suffix, blend_path)
+        os.replace(meta_path + suffix, meta_path)
+    except Exception as e:
+        logger.warning("Could not store %s: %s", key, e)
+        for path in (blend_path + suffix, meta_path + suffix):
+            if os.path.exists(path):
+                os.remove(path)
+        return
+    logger.debug("Stored %s with %d objects", key, len(objects))
+    _evict()
+
+def _evict():
+    """Delete least recently used entries until the cache fits in MAX_CACHE_BYTES"""
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".blend"):
+            continue
+        key = name[:-len(".blend")]
+        try:
+            size = sum(os.path.getsize(path) for path in _paths(key) if os.path.exists(path))
+            entries.append((os.path.getmtime(os.path.join(CACHE_DIR, name)), size, key))
+        except OSError:
+            continue  # removed by another worker meanwhile
+        total += size
+    for _, size, key in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        _remove(key)
+        total -= size
+        logger.info("Evicted %s", key)
+
+def _load_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _touch(key):
+    for path in _paths(key):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+def _remove(key):
+    for path in _paths(key):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _paths(key):
+    return os.path.join(CACHE_DIR, f"{key}.blend"), os.path.join(CACHE_DIR, f"{key}.json")
@@ -1,113 +1,109 @@
 import bpy
+import history
+import face_groups
+import logging
 import bmesh
-import mathutils
+import mesh_buffers
+import numpy as np
+import primitives
+import scene_objects
+
+logger = logging.getLogger("blend_rest.bisect_plane")
 
 def execute_bisect_plane(cmd):
     """Perform bisect plane operation assuming faces are already selected"""
     # Perform bisect plane operation assuming faces are already selected
     bisect_params = cmd.get("params", {})
     target_object = bisect_params.get("target")  # Object to bisect
-    factor = bisect_params.get("factor", 0.0)   # Offset along cylinder axis
+    # Offsets along cylinder axis; several factors cut several rings in one pass
+    factors = bisect_params.get("factors", [bisect_params.get("factor", 0.0)])
+    if not isinstance(factors, (list, tuple)):
+        factors = [factors]
     
     # Get the target object
-    obj = bpy.data.objects.get(target_object)
+    obj = scene_objects.get(target_object)
     if not obj:
-        print(f"Error: Object '{target_object}' not found")
+        logger.error("Object '%s' not found", target_object)
         return False
     
-    # Create BMesh from edit mesh
-    bm = bmesh.from_edit_mesh(obj.data)
+    in_edit_mode = obj.mode == 'EDIT'
+    if in_edit_mode:
+        obj.update_from_editmode()
+    mesh = obj.data
     
     # Get selected faces (assumes selection was already made via select_faces)
-    selected_faces = [f for f in bm.faces if f.select]
-    
-    if not selected_faces:
-        print("Error: No faces selected for1.0 bisect operation")
-        bpy.ops.object.mode_set(mode='OBJECT')
+    selected = mesh_buffers.read(mesh.polygons, "select", bool)
+    if not selected.any():
+        logger.error("No faces selected for bisect operation")
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
         return False
     
-    # Debug output: show selected faces
-    print(f"Number of selected faces: {len(selected_faces)}")
-    for i, face in enumerate(selected_faces):
-        print(f"Face {i} center: {face.calc_center_median()}, area: {face.calc_area()}")
-    
-    # Calculate weighted center of selected faces
-    total_area = 0.0
-    weighted_center = mathutils.Vector((0, 0, 0))
-    
-    for face in selected_faces:
-        face_center = face.calc_center_median()
-        face_area = face.calc_area()
-        weighted_center += face_center * face_area
-        total_area += face_area
-    
-    if total_area > 0:
-        plane_co = weighted_center / total_area
-    else:
-        plane_co = selected_faces[0].calc_center_median()
-    
-    # Debug output: show weighted center calculation
-    print(f"Weighted center calculation: total_area={total_area}, weighted_center={weighted_center}, plane_co={plane_co}")
-    
-    # Calculate cylinder axis using bounding box method (more reliable than face normals)
-    # Get the bounding box of selected faces to determine cylinder orientation
-    bbox_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
-    bbox_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
-    
-    for face in selected_faces:
-        for vert in face.verts:
-            bbox_min.x = min(bbox_min.x, vert.co.x)
-            bbox_min.y = min(bbox_min.y, vert.co.y)
-            bbox_min.z = min(bbox_min.z, vert.co.z)
-            bbox_max.x = max(bbox_max.x, vert.co.x)
-            bbox_max.y = max(bbox_max.y, vert.co.y)
-            bbox_max.z = max(bbox_max.z, vert.co.z)
-    
-    # Calculate the dimensions of the bounding box
-    bbox_size = bbox_max - bbox_min
+    plane_co, cylinder_axis, axis_index = selection_plane(mesh, selected)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Bisecting %d selected faces: center=%s, axis index=%d", selected.sum(), plane_co.tolist(), axis_index)
     
-    # Find the longest axis - this is likely the cylinder's main axis
-    longest_axis_index = 0
-    longest_axis_value = bbox_size[0]
-    
-    for i in range(1, 3):
-        if bbox_size[i] > longest_axis_value:
-            longest_axis_value = bbox_size[i]
-            longest_axis_index = i
-    
-    # Create axis vector based on the longest bounding box dimension
-    cylinder_axis = mathutils.Vector((0, 0, 0))
-    cylinder_axis[longest_axis_index] = 1.0
-    
-    # Transform the axis to object space to ensure it's correctly oriented
-    cylinder_axis = obj.matrix_world.inverted() @ cylinder_axis
-    cylinder_axis.normalize()
-    
-    print(f"Using bounding box method: cylinder axis={cylinder_axis}, longest axis index={longest_axis_index}")
-    
-    # Apply factor offset along the cylinder axis
-    # Positive factor moves toward one end, negative toward the other
-    plane_co = plane_co + cylinder_axis * factor
-    print(f"Final plane position with offset: plane_co={plane_co}")
-    
-    # Perform bisect operation
+    # Cut every plane in one BMesh session, restricted to the selection and the geometry cut from it
+    bm = bmesh.from_edit_mesh(mesh) if in_edit_mode else bmesh.new()
     try:
-        bpy.ops.mesh.bisect(
-            plane_co=plane_co,
-            plane_no=cylinder_axis,
-            use_fill=False,
-            clear_inner=False,
-            clear_outer=False,
-            threshold=0.0001
-        )
-        print(f"Bisect plane applied to '{target_object}' at position {plane_co} with offset {factor}")
+        if not in_edit_mode:
+            bm.from_mesh(mesh)
+        geom = [v for v in bm.verts if v.select] + [e for e in bm.edges if e.select] + [f for f in bm.faces if f.select]
+        for factor in factors:
+            # Positive factor moves toward one end, negative toward the other
+            co = plane_co + cylinder_axis * float(factor)
+            geom = bmesh.ops.bisect_plane(
+                bm, geom=geom, dist=0.0001, plane_co=co.tolist(), plane_no=cylinder_axis.tolist(),
+                clear_inner=False, clear_outer=False)["geom"]
+            logger.debug("Bisect plane applied to '%s' at position %s with offset %s", target_object, co, factor)
+        if in_edit_mode:
+            bmesh.update_edit_mesh(mesh)
+        else:
+            bm.to_mesh(mesh)
+            mesh.update()
     except Exception as e:
-        print(f"Error applying bisect: {e}")
+        logger.error("Could not apply bisect: %s", e)
         return False
     finally:
+        if not in_edit_mode:
+            bm.free()
         # Return to object mode
-        print("done")
-        bpy.ops.object.mode_set(mode='OBJECT')
+        if in_edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        face_groups.invalidate(mesh)
     
-    bpy.ops.ed.undo_push(message="Bisect plane applied")
+    history.push("Bisect plane applied" if len(factors) == 1 else f"Bisect planes applied ({len(factors)})")
     return True
+
+def selection_plane(mesh, selected):
+    """Area-weighted center of the selected faces and the longest axis of their bounding box.
+
+    Both are in object-local coordinates; returns ``(center, axis_vector, axis_index)``.
+    """
+    areas = mesh_buffers.read(mesh.polygons, "area", np.float32)[selected].astype(np.float64)
+    centers = mesh_buffers.read(mesh.polygons, "center", np.float32, 3)[selected].astype(np.float64)
+    total_area = areas.sum()
+    plane_co = (centers * areas[:, None]).sum(axis=0) / total_area if total_area > 0 else centers[0]
+    
+    # Bounding box of the selected faces' vertices determines the cylinder orientation
+    loop_totals = mesh_buffers.read(mesh.polygons, "loop_total", np.int32)
+    loop_verts = mesh_buffers.read(mesh.loops, "vertex_index", np.int32)
+    co = mesh_buffers.read(mesh.vertices, "co", np.float32, 3)
+    verts = co[loop_verts[np.repeat(selected, loop_totals)]]
+    axis_index = int(np.argmax(verts.max(axis=0) - verts.min(axis=0)))
+    cylinder_axis = np.zeros(3)
+    cylinder_axis[axis_index] = 1.0
+    return plane_co, cylinder_axis, axis_index
+
+def validate_bisect_plane(cmd):
+    """Check the target and turn ``factor``/``factors`` into a list of numbers (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    if not isinstance(p.get("target"), str):
+        raise ValueError("target must be an object name")
+    factors = p.get("factors", [p.get("factor", 0.0)])
+    if not isinstance(factors, list):
+        factors = [factors]
+    if not factors:
+        raise ValueError("factors must not be empty")
+    p["factors"] = [primitives.number(factor, f"factors[{i}]") for i, factor in enumerate(factors)]
+    return dict(cmd, params=p)
@@ -1,62 +1,111 @@
 import bpy
+import history
+import face_groups
+import json
+import logging
+import time
+import primitives
+import scene_objects
+
+logger = logging.getLogger("blend_rest.boolean_difference")
+
+# Cutter keys that place the cutter rather than shape it
+CUTTER_TRANSFORMS = ('location', 'rotation', 'scale')
 
 def execute_boolean_difference(cmd):
-    """Perform boolean difference operation with any primitive cutter"""
-    bpy.ops.ed.undo_push(message="Original")
+    """Cut any number of primitive cutters out of a target with one boolean modifier"""
+    history.push("Original")
     # Create a boolean difference operation
     target_name = cmd.get("target")
-    cutter_params = cmd.get("cutter", {})
+    # "cutters" takes a list of cutter specs; a single "cutter" is the one-element case
+    cutters = cmd.get("cutters") or [cmd.get("cutter", {})]
+    solver = cmd.get("solver", "EXACT").upper()
     
     # Get the target object
-    target_obj = bpy.data.objects.get(target_name)
+    target_obj = scene_objects.get(target_name)
     if not target_obj:
         return False
-        
-    # Create cutter object with any primitive type
-    cutter_type = cutter_params.get("type", "cylinder")
-    cutter_location = cutter_params.get("location", [0, 0, 0])
-    cutter_rotation = cutter_params.get("rotation", [0, 0, 0])  # Euler angles in radians
-    
-    # Get all parameters excluding type, location, and rotation
-    cutter_props = {k: v for k, v in cutter_params.items() if k not in ['type', 'location', 'rotation']}
-    
-    # Create cutter primitive based on type
-    if cutter_type == "cube":
-        bpy.ops.mesh.primitive_cube_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "cylinder":
-        bpy.ops.mesh.primitive_cylinder_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "uv_sphere":
-        bpy.ops.mesh.primitive_uv_sphere_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "ico_sphere":
-        bpy.ops.mesh.primitive_ico_sphere_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "cone":
-        bpy.ops.mesh.primitive_cone_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "torus":
-        bpy.ops.mesh.primitive_torus_add(location=cutter_location, **cutter_props)
-    elif cutter_type == "plane":
-        bpy.ops.mesh.primitive_plane_add(location=cutter_location, **cutter_props)
-    else:
-        print(f"Error: Unsupported primitive type '{cutter_type}'")
+    if solver not in ("EXACT", "FAST"):
+        logger.error("Unsupported boolean solver '%s'", solver)
         return False
-        
-    cutter_obj = bpy.context.active_object
-    cutter_obj.name = "BooleanCutter"
-    
-    # Apply rotation to cutter object (if specified)
-    if cutter_rotation != [0, 0, 0]:
-        cutter_obj.rotation_euler = cutter_rotation
-    
-    # Apply boolean modifier to target object
-    bool_mod = target_obj.modifiers.new(name="BooleanDifference", type='BOOLEAN')
-    bool_mod.operation = 'DIFFERENCE'
-    bool_mod.object = cutter_obj
     
-    # Apply the modifier
-    bpy.context.view_layer.objects.active = target_obj
-    bpy.ops.object.modifier_apply(modifier=bool_mod.name)
+    start = time.perf_counter()
+    collection = bpy.data.collections.new("BooleanCutters")
+    bpy.context.scene.collection.children.link(collection)
+    meshes = {}
+    modifier_name = None
+    try:
+        # Cutters link the cached template mesh of their primitive, so identical cutters share it
+        for cutter_params in cutters:
+            cutter_type = cutter_params.get("type", "cylinder")
+            # Get all parameters excluding type and transform
+            cutter_props = {k: v for k, v in cutter_params.items() if k != 'type' and k not in CUTTER_TRANSFORMS}
+            key = (cutter_type, json.dumps(cutter_props, sort_keys=True))
+            if key not in meshes:
+                meshes[key] = primitives.template_mesh(cutter_type, cutter_props)
+            cutter_obj = bpy.data.objects.new("BooleanCutter", meshes[key])
+            cutter_obj.location = cutter_params.get("location", [0, 0, 0])
+            cutter_obj.rotation_euler = cutter_params.get("rotation", [0, 0, 0])  # Euler angles in radians
+            cutter_obj.scale = cutter_params.get("scale", [1, 1, 1])
+            collection.objects.link(cutter_obj)
+        built = time.perf_counter()
+        
+        # Apply one boolean modifier with the whole collection as operand
+        bool_mod = target_obj.modifiers.new(name="BooleanDifference", type='BOOLEAN')
+        modifier_name = bool_mod.name
+        bool_mod.operation = 'DIFFERENCE'
+        bool_mod.solver = solver
+        bool_mod.operand_type = 'COLLECTION'
+        bool_mod.collection = collection
+        bpy.context.view_layer.objects.active = target_obj
+        bpy.ops.object.modifier_apply(modifier=bool_mod.name)
+        face_groups.invalidate(target_obj.data)
+        applied = time.perf_counter()
+    except ValueError as e:
+        logger.error("%s", e)
+        return False
+    finally:
+        # A modifier left behind by a failed apply would otherwise reference the deleted cutters
+        if modifier_name and target_obj.modifiers.get(modifier_name) is not None:
+            target_obj.modifiers.remove(target_obj.modifiers[modifier_name])
+        # Delete the cutter objects and the collection; the templates are kept for later calls
+        for cutter_obj in list(collection.objects):
+            bpy.data.objects.remove(cutter_obj, do_unlink=True)
+        bpy.data.collections.remove(collection)
+    done = time.perf_counter()
     
-    # Delete the cutter object
-    bpy.data.objects.remove(cutter_obj, do_unlink=True)
+    history.push("Boolean difference created")
+    return {
+        "cutters": len(cutters),
+        "solver": solver,
+        "timings": {"build": built - start, "boolean": applied - built, "cleanup": done - applied, "total": done - start},
+    }
 
-    bpy.ops.ed.undo_push(message="Boolean difference created")
-    return True
+def validate_boolean_difference(cmd):
+    """Check the target, solver and every cutter before the command is queued (runs on the HTTP thread)"""
+    if not isinstance(cmd.get("target"), str):
+        raise ValueError("target must be an object name")
+    solver = str(cmd.get("solver", "EXACT")).upper()
+    if solver not in ("EXACT", "FAST"):
+        raise ValueError(f"Unsupported boolean solver '{solver}'")
+    cutters = cmd.get("cutters") or [cmd.get("cutter", {})]
+    if not isinstance(cutters, list) or not all(isinstance(c, dict) for c in cutters):
+        raise ValueError("cutters must be a list of cutter objects")
+    checked = set()
+    normalized = []
+    for i, cutter in enumerate(cutters):
+        cutter = dict(cutter, type=cutter.get("type", "cylinder"))
+        props = {k: v for k, v in cutter.items() if k != 'type' and k not in CUTTER_TRANSFORMS}
+        # Cutters often repeat one shape at different places, so each shape is checked once
+        key = (cutter["type"], json.dumps(props, sort_keys=True))
+        if key not in checked:
+            try:
+                primitives.primitive_params(cutter["type"], props)
+            except ValueError as e:
+                raise ValueError(f"cutter {i}: {e}") from None
+            checked.add(key)
+        for name in CUTTER_TRANSFORMS:
+            if name in cutter:
+                cutter[name] = primitives.vector3(cutter[name], f"cutter {i} {name}")
+        normalized.append(cutter)
+    return dict(cmd, cutters=normalized, solver=solver)
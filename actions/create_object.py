@@ -1,24 +1,78 @@
 import bpy
+import history
+import logging
+import primitives
+
+logger = logging.getLogger("blend_rest.create_object")
+
+# Placement and instancing options; everything else in params is a primitive parameter
+PLACEMENT_PARAMS = ("name", "location", "rotation", "scale", "locations", "rotations", "count", "linked")
+
+# Most objects one command may create
+MAX_COUNT = 10000
 
 def execute_create_object(cmd):
-    """Create any primitive object"""
+    """Create any primitive object, or ``count`` identical ones, from a cached template mesh"""
     typ = cmd["type"]
-    p = cmd.get("params", {})
+    p = dict(cmd.get("params", {}))
+    
+    # Placement and instancing options; everything else is a primitive parameter
+    name = p.pop("name", None) or primitives.DEFAULT_NAMES.get(typ, typ)
+    # Like the primitive_*_add operators, new objects go to the 3D cursor unless a location is given
+    location = p.pop("location", None) or tuple(bpy.context.scene.cursor.location)
+    rotation = p.pop("rotation", [0, 0, 0])
+    scale = p.pop("scale", [1, 1, 1])
+    locations = p.pop("locations", None)
+    rotations = p.pop("rotations", None)
+    count = p.pop("count", len(locations) if locations else 1)
+    linked = p.pop("linked", False)  # share one mesh between all created objects
     
-    # Create any primitive type
-    if typ == "cube":
-        bpy.ops.mesh.primitive_cube_add(**p)
-    elif typ == "cylinder":
-        bpy.ops.mesh.primitive_cylinder_add(**p)
-    elif typ == "uv_sphere":
-        bpy.ops.mesh.primitive_uv_sphere_add(**p)
-    elif typ == "ico_sphere":
-        bpy.ops.mesh.primitive_ico_sphere_add(**p)
-    elif typ == "cone":
-        bpy.ops.mesh.primitive_cone_add(**p)
-    elif typ == "torus":
-        bpy.ops.mesh.primitive_torus_add(**p)
-    elif typ == "plane":
-        bpy.ops.mesh.primitive_plane_add(**p)
-    else:
-        print(f"Error: Unsupported primitive type '{typ}'")
+    try:
+        template = primitives.template_mesh(typ, p)
+    except ValueError as e:
+        logger.error("%s", e)
+        return False
+    if not isinstance(count, int) or count < 1:
+        logger.error("count must be a positive integer, got %r", count)
+        return False
+    for key, values in (("locations", locations), ("rotations", rotations)):
+        if values is not None and len(values) != count:
+            logger.error("%s has %d entries but count is %d", key, len(values), count)
+            return False
+    
+    # Like the primitive_*_add operators: new objects end up selected, the last one active
+    collection = bpy.context.collection or bpy.context.scene.collection
+    for obj in list(bpy.context.view_layer.objects.selected):
+        obj.select_set(False)
+    
+    shared_mesh = primitives.instance_mesh(template, name) if linked else None
+    created = []
+    for i in range(count):
+        obj = bpy.data.objects.new(name, shared_mesh or primitives.instance_mesh(template, name))
+        obj.location = locations[i] if locations else location
+        obj.rotation_euler = rotations[i] if rotations else rotation
+        obj.scale = scale
+        collection.objects.link(obj)
+        obj.select_set(True)
+        created.append(obj.name)
+    bpy.context.view_layer.objects.active = obj
+    
+    history.push(f"Created {count} {typ}" if count > 1 else f"Created {typ}")
+    return {"objects": created}
+
+def validate_create_object(cmd):
+    """Check type, parameters and placement before the command is queued (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    primitives.primitive_params(cmd.get("type"), {k: v for k, v in p.items() if k not in PLACEMENT_PARAMS})
+    for key in ("location", "rotation", "scale"):
+        if key in p:
+            p[key] = primitives.vector3(p[key], key)
+    for key in ("locations", "rotations"):
+        if p.get(key) is not None:
+            p[key] = [primitives.vector3(value, f"{key}[{i}]") for i, value in enumerate(p[key])]
+    count = p.get("count", len(p["locations"]) if p.get("locations") else 1)
+    primitives.number(count, "count", integer=True, minimum=1, maximum=MAX_COUNT)
+    for key in ("locations", "rotations"):
+        if p.get(key) is not None and len(p[key]) != count:
+            raise ValueError(f"{key} has {len(p[key])} entries but count is {count}")
+    return dict(cmd, params=p)
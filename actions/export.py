@@ -0,0 +1,303 @@
+import bpy
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+import zipfile
+import mesh_buffers
+import numpy as np
+import scene_objects
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("blend_rest.export")
+
+# Where exports are written; set BLEND_REST_EXPORT_DIR (or headless.py --output-dir) to change it (workers may share one)
+EXPORT_DIR = os.environ.get("BLEND_REST_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "blend-rest-exports")
+
+# Total size of finished exports before the least recently used ones are deleted
+MAX_EXPORT_BYTES = int(os.environ.get("BLEND_REST_EXPORT_BYTES") or 1024 * 1024 * 1024)
+
+# A write whose marker has not been finished within this many seconds was abandoned by a dead process
+STALE_WRITE_SECONDS = 600.0
+
+# Formats written from mesh buffers off the main thread, and those that need Blender's exporters
+BUFFER_FORMATS = {"stl": "stl", "obj": "obj", "3mf": "3mf"}
+OPERATOR_FORMATS = {"glb": "glb"}
+
+# Units the 3MF core specification allows for <model unit="...">
+UNITS_3MF = ("micron", "millimeter", "centimeter", "inch", "foot", "meter")
+
+# File ids are the content hash plus the format's extension
+_FILE_ID = re.compile(r'[0-9a-f]{32}\.(stl|obj|3mf|glb)')
+
+# Exports in progress and failed ones are files next to the export, so every worker sharing
+# EXPORT_DIR sees them: <file_id>.writing is written to and renamed when done, and
+# <file_id>.failed holds the error message
+WRITING = ".writing"
+FAILED = ".failed"
+
+_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="blend-rest-export")
+
+def execute_export(cmd):
+    """Export mesh objects to a file in EXPORT_DIR and return its file id"""
+    params = cmd.get("params", {})
+    fmt = params.get("format", "stl").lower()
+    if fmt not in BUFFER_FORMATS and fmt not in OPERATOR_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}', expected one of "
+                         f"{', '.join(list(BUFFER_FORMATS) + list(OPERATOR_FORMATS))}")
+    evaluated = params.get("evaluated", True)  # include modifiers
+    unit = params.get("unit", "millimeter")  # 3MF only
+    
+    targets = params.get("targets")
+    if targets:
+        objects = [scene_objects.get(name) for name in targets]
+        missing = [name for name, obj in zip(targets, objects) if obj is None or obj.type != 'MESH']
+        if missing:
+            raise ValueError(f"Not mesh objects: {', '.join(missing)}")
+    else:
+        objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH' and obj.visible_get()]
+    if not objects:
+        raise ValueError("Nothing to export")
+    
+    # The content hash covers everything that ends up in the file, so identical exports share one file
+    meshes = [_read_object(obj, evaluated) for obj in objects]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((fmt, evaluated, unit if fmt == "3mf" else None)).encode())
+    for mesh in meshes:
+        digest.update(repr((mesh["name"], mesh["materials"])).encode())
+        for key in ("vertices", "face_sizes", "face_indices", "triangles"):
+            digest.update(mesh[key].tobytes())
+    file_id = f"{digest.hexdigest()}.{fmt}"
+    path = os.path.join(EXPORT_DIR, file_id)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    
+    result = {"file_id": file_id, "format": fmt, "objects": len(objects), "url": f"/v1/files/{file_id}"}
+    if os.path.exists(path):
+        _touch(path)
+        return dict(result, status="ready", size=os.path.getsize(path), deduplicated=True)
+    if not _claim(path):
+        return dict(result, status="writing", deduplicated=True)
+    
+    if fmt in OPERATOR_FORMATS:
+        # Blender's exporters need the main thread
+        _write_file(file_id, path, _export_glb, objects, evaluated)
+        info = file_info(file_id)
+        info.pop("path", None)
+        return dict(result, **info, deduplicated=False)
+    
+    writer = {"stl": write_stl, "obj": write_obj, "3mf": write_3mf}[fmt]
+    args = (meshes, unit) if fmt == "3mf" else (meshes,)
+    _writer.submit(_write_file, file_id, path, writer, *args)
+    logger.debug("Writing %d objects to %s", len(objects), file_id)
+    return dict(result, status="writing", deduplicated=False)
+
+def file_info(file_id):
+    """Status of an export: ``writing``, ``ready`` (with ``size`` and ``path``) or ``failed`` (with ``error``).
+
+    Returns None for unknown or malformed ids.
+    """
+    if not _FILE_ID.fullmatch(file_id):
+        return None
+    path = os.path.join(EXPORT_DIR, file_id)
+    try:
+        return {"status": "ready", "size": os.path.getsize(path), "path": path}
+    except OSError:
+        pass
+    try:
+        if time.time() - os.path.getmtime(path + WRITING) < STALE_WRITE_SECONDS:
+            return {"status": "writing"}
+    except OSError:
+        pass
+    try:
+        with open(path + FAILED) as f:
+            return {"status": "failed", "error": f.read()}
+    except OSError:
+        return None
+
+def list_files():
+    """Finished exports in EXPORT_DIR, newest first"""
+    if not os.path.isdir(EXPORT_DIR):
+        return []
+    entries = [entry for entry in os.scandir(EXPORT_DIR) if _FILE_ID.fullmatch(entry.name)]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [{"file_id": entry.name, "size": entry.stat().st_size, "modified": entry.stat().st_mtime}
+            for entry in entries]
+
+def _claim(path):
+    """Create the export's .writing marker; False if another thread or worker is already writing it"""
+    marker = path + WRITING
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(marker) < STALE_WRITE_SECONDS:
+                return False
+        except OSError:
+            return False  # finished or failed meanwhile
+        # Left behind by a worker that died while writing
+        _touch(marker)
+    if os.path.exists(path + FAILED):
+        os.remove(path + FAILED)
+    return True
+
+def _write_file(file_id, path, writer, *args):
+    """Write into the .writing marker and rename it, so a file id only ever names a complete export"""
+    marker = path + WRITING
+    try:
+        writer(marker, *args)
+        os.replace(marker, path)
+    except Exception as e:
+        logger.error("Could not write %s: %s", file_id, e)
+        with open(path + FAILED, "w") as f:
+            f.write(str(e))
+        if os.path.exists(marker):
+            os.remove(marker)
+        return
+    logger.debug("Wrote %s", file_id)
+    _evict(path)
+
+def _evict(keep):
+    """Delete least recently used exports (and old failure notes) until EXPORT_DIR fits in MAX_EXPORT_BYTES"""
+    entries = []
+    total = 0
+    for entry in os.scandir(EXPORT_DIR):
+        if _FILE_ID.fullmatch(entry.name) or entry.name.endswith(FAILED):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # removed by another worker meanwhile
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    for _, size, path in sorted(entries):
+        if total <= MAX_EXPORT_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # already removed, or still open for a download on Windows
+        total -= size
+        logger.info("Evicted %s", os.path.basename(path))
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _read_object(obj, evaluated):
+    """Copy an object's world-space geometry into arrays on the main thread"""
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+    source = obj.evaluated_get(bpy.context.evaluated_depsgraph_get()) if evaluated else obj
+    mesh = source.to_mesh()
+    try:
+        if hasattr(mesh, "calc_loop_triangles"):
+            mesh.calc_loop_triangles()
+        vertices = mesh_buffers.read(mesh.vertices, "co", np.float32, 3)
+        matrix = np.array(obj.matrix_world, dtype=np.float32)
+        return {
+            "name": obj.name,
+            "materials": [slot.material.name if slot.material else None for slot in obj.material_slots],
+            "vertices": vertices @ matrix[:3, :3].T + matrix[:3, 3],
+            "face_sizes": mesh_buffers.read(mesh.polygons, "loop_total", np.int32),
+            "face_indices": mesh_buffers.read(mesh.loops, "vertex_index", np.int32),
+            "triangles": mesh_buffers.read(mesh.loop_triangles, "vertices", np.int32, 3),
+        }
+    finally:
+        source.to_mesh_clear()
+
+def write_stl(path, meshes):
+    """Binary STL of all meshes' triangles"""
+    records = []
+    for mesh in meshes:
+        corners = mesh["vertices"][mesh["triangles"]]
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        record = np.zeros(len(corners), dtype=[("normal", "<f4", 3), ("corners", "<f4", (3, 3)), ("attribute", "<u2")])
+        record["normal"] = normals / np.where(lengths == 0, 1, lengths)
+        record["corners"] = corners
+        records.append(record)
+    records = np.concatenate(records)
+    with open(path, "wb") as f:
+        f.write(b"Blend-REST STL export".ljust(80, b" "))
+        f.write(np.uint32(len(records)).tobytes())
+        records.tofile(f)
+
+def write_obj(path, meshes):
+    """Wavefront OBJ with one object per mesh and the original polygons"""
+    offset = 1
+    with open(path, "w", newline="\n") as f:
+        f.write("# Blend-REST OBJ export\n")
+        for mesh in meshes:
+            f.write(f"o {mesh['name']}\n")
+            np.savetxt(f, mesh["vertices"], fmt="v %.6f %.6f %.6f")
+            indices = (mesh["face_indices"] + offset).astype(str)
+            starts = np.concatenate([[0], np.cumsum(mesh["face_sizes"])])
+            f.writelines("f " + " ".join(indices[start:end]) + "\n" for start, end in zip(starts[:-1], starts[1:]))
+            offset += len(mesh["vertices"])
+
+def write_3mf(path, meshes, unit="millimeter"):
+    """3MF package with one mesh object per mesh, all placed in the build"""
+    objects, items = [], []
+    for object_id, mesh in enumerate(meshes, start=1):
+        vertices = "".join(f'<vertex x="{x:.6f}" y="{y:.6f}" z="{z:.6f}"/>' for x, y, z in mesh["vertices"].tolist())
+        triangles = "".join(f'<triangle v1="{a}" v2="{b}" v3="{c}"/>' for a, b, c in mesh["triangles"].tolist())
+        name = mesh["name"].replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;")
+        objects.append(f'<object id="{object_id}" name="{name}" type="model"><mesh>'
+                       f'<vertices>{vertices}</vertices><triangles>{triangles}</triangles></mesh></object>')
+        items.append(f'<item objectid="{object_id}"/>')
+    model = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+             f'<model unit="{unit}" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">'
+             f'<resources>{"".join(objects)}</resources><build>{"".join(items)}</build></model>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml",
+                         '<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                         '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+                         '</Types>')
+        package.writestr("_rels/.rels",
+                         '<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+                         'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/></Relationships>')
+        package.writestr("3D/3dmodel.model", model)
+
+def _export_glb(path, objects, evaluated):
+    """Binary glTF through Blender's exporter with only ``objects`` selected"""
+    view_layer = bpy.context.view_layer
+    previous = [obj for obj in view_layer.objects if obj.select_get()]
+    for obj in previous:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    try:
+        # The exporter appends the extension itself
+        bpy.ops.export_scene.gltf(filepath=path, export_format='GLB', use_selection=True, export_apply=evaluated)
+        if not path.endswith(".glb"):
+            os.replace(path + ".glb", path)
+    finally:
+        for obj in objects:
+            obj.select_set(False)
+        for obj in previous:
+            obj.select_set(True)
+
+def validate_export(cmd):
+    """Check format, unit and targets before the command is queued (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    fmt = p.get("format", "stl")
+    if not isinstance(fmt, str) or (fmt.lower() not in BUFFER_FORMATS and fmt.lower() not in OPERATOR_FORMATS):
+        raise ValueError(f"Unsupported export format {fmt!r}, expected one of "
+                         f"{', '.join(list(BUFFER_FORMATS) + list(OPERATOR_FORMATS))}")
+    if not isinstance(p.get("evaluated", True), bool):
+        raise ValueError("evaluated must be true or false")
+    if p.get("unit", "millimeter") not in UNITS_3MF:
+        raise ValueError(f"unit must be one of {', '.join(UNITS_3MF)}")
+    targets = p.get("targets")
+    if targets is not None and (not isinstance(targets, list) or not all(isinstance(t, str) for t in targets)):
+        raise ValueError("targets must be a list of object names")
+    return dict(cmd, params=p)
@@ -0,0 +1,148 @@
+import bpy
+import hashlib
+import logging
+import mesh_buffers
+import numpy as np
+import scene_objects
+from collections import OrderedDict
+
+logger = logging.getLogger("blend_rest.face_groups")
+
+# Face groups per mesh datablock (as_pointer()), least recently used first
+_cache = OrderedDict()
+MAX_CACHED_MESHES = 32
+
+def ring_face_groups(mesh):
+    """Split the quad faces of a mesh into the segments between bisect rings.
+
+    Vectorized equivalent of the BMesh reference in
+    benchmarks/bench_select_faces.py: ring vertices are those used by exactly
+    4 faces, ring edges join two ring vertices, and ring positions are the
+    mean axis coordinate of ring edge centers grouped by their position
+    rounded to 4 decimals. Quad faces are bucketed between
+    consecutive ring positions by their median center. Float32 arithmetic
+    follows BMesh so the groups are identical. Returns a list of ascending
+    face index arrays; empty segments are skipped.
+    """
+    return _group_faces(_read_topology(mesh))["groups"]
+
+def face_group_index(mesh):
+    """Return the cached ring face groups of a mesh, recomputing them if its data changed.
+
+    Entries are keyed on the mesh datablock and hold a fingerprint of its
+    topology and coordinates, so edits made outside the actions that call
+    ``invalidate`` are still noticed. The returned dict holds ``groups``,
+    ``axis``, ``ring_positions``, ``ranges`` (min/max face center along the
+    axis per group) and ``cached``; it must not be mutated.
+    """
+    arrays = _read_topology(mesh)
+    key = mesh.as_pointer()
+    fingerprint = _fingerprint(arrays)
+    entry = _cache.get(key)
+    if entry is not None and entry["fingerprint"] == fingerprint:
+        _cache.move_to_end(key)
+        return dict(entry, cached=True)
+
+    entry = _group_faces(arrays)
+    entry["fingerprint"] = fingerprint
+    _cache[key] = entry
+    _cache.move_to_end(key)
+    while len(_cache) > MAX_CACHED_MESHES:
+        _cache.popitem(last=False)
+    return dict(entry, cached=False)
+
+def invalidate(mesh):
+    """Drop the cached face groups of a mesh; call after modifying its geometry"""
+    _cache.pop(mesh.as_pointer(), None)
+
+def clear():
+    """Drop all cached face groups (mesh pointers are meaningless after loading a file)"""
+    _cache.clear()
+
+def describe_face_groups(name, faces=False):
+    """Summarize the ring face groups of an object for the API (runs on the main thread)"""
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        raise scene_objects.ObjectNotFound(f"Object '{name}' not found")
+    if obj.type != 'MESH':
+        raise ValueError(f"Object '{name}' is a {obj.type}, not a MESH")
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+    index = face_group_index(obj.data)
+    groups = []
+    for i, (group, (low, high)) in enumerate(zip(index["groups"], index["ranges"])):
+        entry = {"index": i, "face_count": len(group), "min": low, "max": high}
+        if faces:
+            entry["faces"] = group.tolist()
+        groups.append(entry)
+    return {
+        "name": name,
+        "axis": "XYZ"[index["axis"]] if index["axis"] is not None else None,
+        "ring_positions": index["ring_positions"],
+        "groups": groups,
+        "cached": index["cached"],
+    }
+
+def _read_topology(mesh):
+    return {
+        "co": mesh_buffers.read(mesh.vertices, "co", np.float32, 3),
+        "loop_totals": mesh_buffers.read(mesh.polygons, "loop_total", np.int32),
+        "loop_starts": mesh_buffers.read(mesh.polygons, "loop_start", np.int32),
+        "loop_verts": mesh_buffers.read(mesh.loops, "vertex_index", np.int32),
+        "edge_verts": mesh_buffers.read(mesh.edges, "vertices", np.int32, 2),
+    }
+
+def _fingerprint(arrays):
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays.values():
+        digest.update(array.tobytes())
+    return tuple(len(a) for a in arrays.values()) + (digest.hexdigest(),)
+
+def _group_faces(arrays):
+    co = arrays["co"]
+    loop_totals, loop_starts = arrays["loop_totals"], arrays["loop_starts"]
+    loop_verts, edge_verts = arrays["loop_verts"], arrays["edge_verts"]
+    empty = {"groups": [], "axis": None, "ring_positions": [], "ranges": []}
+
+    quad_faces = np.flatnonzero(loop_totals == 4)
+    if not len(quad_faces):
+        logger.debug("No quad faces found - cannot perform ring selection")
+        return empty
+
+    # Vertices that are part of rings (used by 4 faces) and the edges joining them
+    valence = np.bincount(loop_verts, minlength=len(co))
+    ring_vertex = valence == 4
+    ring_edges = edge_verts[ring_vertex[edge_verts[:, 0]] & ring_vertex[edge_verts[:, 1]]]
+    if not len(ring_edges):
+        logger.debug("No ring vertices found" if not ring_vertex.any() else "No ring edges found")
+        return empty
+
+    # Cylinder main axis: longest side of the bounding box of the quads' vertices
+    quad_verts = loop_verts[loop_starts[quad_faces][:, None] + np.arange(4)]
+    quad_co = co[quad_verts.ravel()]
+    cylinder_axis = int(np.argmax(quad_co.max(axis=0) - quad_co.min(axis=0)))
+
+    # Ring edge centers along the axis, grouped by the same rounded key as the BMesh version
+    positions = ((co[ring_edges[:, 0]] + co[ring_edges[:, 1]]) * np.float32(0.5))[:, cylinder_axis].astype(np.float64)
+    unique_positions, inverse = np.unique(positions, return_inverse=True)
+    unique_keys, key_inverse = np.unique([round(p, 4) for p in unique_positions.tolist()], return_inverse=True)
+    group_of_edge = key_inverse[inverse]
+    order = np.argsort(group_of_edge, kind="stable")
+    bounds = np.flatnonzero(np.diff(group_of_edge[order])) + 1
+    ring_positions = sorted(sum(chunk.tolist()) / len(chunk) for chunk in np.split(positions[order], bounds))
+
+    # Quad centers as BMesh computes them: float32 sum of corners times 1/4
+    corners = co[quad_verts]
+    centers = (((corners[:, 0] + corners[:, 1]) + corners[:, 2]) + corners[:, 3]) * np.float32(0.25)
+    center_positions = centers[:, cylinder_axis].astype(np.float64)
+    segment = np.searchsorted(np.array(ring_positions), center_positions, side="right")
+
+    by_segment = np.argsort(segment, kind="stable")
+    chunks = np.split(by_segment, np.flatnonzero(np.diff(segment[by_segment])) + 1)
+    return {
+        "groups": [quad_faces[chunk] for chunk in chunks],
+        "axis": cylinder_axis,
+        "ring_positions": ring_positions,
+        "ranges": [(float(center_positions[chunk].min()), float(center_positions[chunk].max())) for chunk in chunks],
+    }
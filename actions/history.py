@@ -0,0 +1,21 @@
+import bpy
+from contextlib import contextmanager
+
+# Nesting depth of suspended() blocks; only touched from Blender's main thread
+_suspend_depth = 0
+
+def push(message):
+    """Push an undo step unless an enclosing batch has suspended pushes"""
+    if _suspend_depth:
+        return
+    bpy.ops.ed.undo_push(message=message)
+
+@contextmanager
+def suspended():
+    """Suppress per-action undo pushes so a batch can record a single step"""
+    global _suspend_depth
+    _suspend_depth += 1
+    try:
+        yield
+    finally:
+        _suspend_depth -= 1
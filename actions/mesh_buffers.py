@@ -0,0 +1,85 @@
+import bpy
+import io
+import numpy as np
+import scene_objects
+
+def read_mesh_buffers(name, evaluated=False, world=False, normals=True):
+    """Copy an object's mesh into NumPy arrays with foreach_get (runs on the main thread).
+
+    Returns ``vertices`` (N x 3 float32), ``face_sizes`` (F int32) and the
+    concatenated ``face_indices`` (int32), plus per-vertex ``normals`` and
+    ``face_normals`` (float32) when requested. ``evaluated`` reads the mesh
+    after modifiers, ``world`` applies the object's world matrix.
+    """
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        raise scene_objects.ObjectNotFound(f"Object '{name}' not found")
+    if obj.type != 'MESH':
+        raise ValueError(f"Object '{name}' is a {obj.type}, not a MESH")
+
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+    if evaluated:
+        eval_obj = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+        mesh = eval_obj.to_mesh()
+        try:
+            buffers = _read(mesh, normals)
+        finally:
+            eval_obj.to_mesh_clear()
+    else:
+        buffers = _read(obj.data, normals)
+
+    if world:
+        matrix = np.array(obj.matrix_world, dtype=np.float32)
+        buffers["vertices"] = buffers["vertices"] @ matrix[:3, :3].T + matrix[:3, 3]
+        if normals:
+            # Normals transform by the inverse transpose to stay perpendicular under non-uniform scale
+            normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+            for key in ("normals", "face_normals"):
+                transformed = buffers[key] @ normal_matrix.T
+                lengths = np.linalg.norm(transformed, axis=1, keepdims=True)
+                buffers[key] = transformed / np.where(lengths == 0, 1, lengths)
+    return buffers
+
+def _read(mesh, normals):
+    buffers = {
+        "vertices": read(mesh.vertices, "co", np.float32, 3),
+        "face_sizes": read(mesh.polygons, "loop_total", np.int32),
+        "face_indices": read(mesh.loops, "vertex_index", np.int32),
+    }
+    if normals:
+        # vertex_normals/polygon_normals exist since Blender 3.5 and are the only option from 4.1
+        if hasattr(mesh, "vertex_normals"):
+            buffers["normals"] = read(mesh.vertex_normals, "vector", np.float32, 3)
+            buffers["face_normals"] = read(mesh.polygon_normals, "vector", np.float32, 3)
+        else:
+            buffers["normals"] = read(mesh.vertices, "normal", np.float32, 3)
+            buffers["face_normals"] = read(mesh.polygons, "normal", np.float32, 3)
+    return buffers
+
+def read(collection, attr, dtype, width=1):
+    """``attr`` of every item in a bpy collection as one NumPy array (``width`` columns), via foreach_get"""
+    array = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, array)
+    return array.reshape(-1, width) if width > 1 else array
+
+def encode_npz(buffers, compressed=False):
+    out = io.BytesIO()
+    (np.savez_compressed if compressed else np.savez)(out, **buffers)
+    return out.getvalue()
+
+def encode_raw(buffers):
+    """Concatenate the buffers little-endian in the polygon_shape upload layout, normals last.
+
+    Returns the body and the headers a client needs to split it.
+    """
+    order = [k for k in ("vertices", "face_sizes", "face_indices", "normals", "face_normals") if k in buffers]
+    body = b"".join(buffers[k].astype(buffers[k].dtype.newbyteorder("<"), copy=False).tobytes() for k in order)
+    headers = {
+        "X-Vertex-Count": len(buffers["vertices"]),
+        "X-Face-Count": len(buffers["face_sizes"]),
+        "X-Index-Count": len(buffers["face_indices"]),
+        "X-Buffers": ",".join(order),
+    }
+    return body, headers
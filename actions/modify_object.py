@@ -1,11 +1,183 @@
 import bpy
+import history
+import io
+import logging
+import re
+import numpy as np
+import scene_objects
+
+logger = logging.getLogger("blend_rest.modify_object")
+
+# Transform arrays accepted in bulk form and the object properties they set
+TRANSFORMS = {"location": "location", "rotation": "rotation_euler", "scale": "scale"}
+
+_KEY = r'\[(-?\d+|"[^"]*"|\'[^\']*\')\]'
+_PATH = re.compile(r'[A-Za-z_]\w*(?:\.[A-Za-z_]\w*|' + _KEY + r')*')
+_PATH_TOKEN = re.compile(r'\.?([A-Za-z_]\w*)|' + _KEY)
 
 def execute_modify_object(cmd):
-    """Modify object properties"""
+    """Modify properties of one object, or transforms and properties of many in one pass"""
     params = cmd.get("params", {})
-    obj_name = params.get("target")
+    targets = params.get("targets") or [params.get("target")]
     props = params.get("properties", {})
-    obj = bpy.data.objects.get(obj_name)
-    if obj:
-        for k,v in props.items():
-            setattr(obj, k, v)
+    if isinstance(props, list) and len(props) != len(targets):
+        raise ValueError(f"properties has {len(props)} entries but {len(targets)} targets were given")
+    
+    objects = [scene_objects.get(name) for name in targets]
+    missing = [name for name, obj in zip(targets, objects) if obj is None]
+    found = [i for i, obj in enumerate(objects) if obj is not None]
+    if not found:
+        logger.error("Objects not found: %s", ", ".join(map(str, missing)))
+        return False
+    
+    transforms = {}
+    for key in TRANSFORMS:
+        if params.get(key) is not None:
+            values = np.asarray(params[key], dtype=np.float32)
+            if values.shape not in ((3,), (len(targets), 3)):
+                raise ValueError(f"{key} must be [x, y, z] or one [x, y, z] per target")
+            transforms[key] = np.broadcast_to(values, (len(targets), 3))[found]
+    bulk = _apply_transforms([objects[i] for i in found], transforms)
+    
+    for i in found:
+        for path, value in (props[i] if isinstance(props, list) else props).items():
+            set_property(objects[i], path, value)
+    
+    for obj in bulk:
+        obj.update_tag()
+    if len(targets) > 1:
+        # One depsgraph evaluation for everything changed above; a single object's
+        # changes are tagged and evaluated with the next redraw like any other edit
+        bpy.context.view_layer.update()
+        history.push(f"Modified {len(found)} objects")
+    if missing:
+        logger.warning("Objects not found: %s", ", ".join(map(str, missing)))
+    return {"modified": len(found), "missing": missing}
+
+def validate_modify_object(cmd):
+    """Check targets and property paths and turn transforms into arrays (runs on the HTTP thread)"""
+    params = dict(cmd.get("params") or {})
+    targets = params.get("targets") or [params.get("target")]
+    if not isinstance(targets, list) or not all(isinstance(name, str) for name in targets):
+        raise ValueError("target must be an object name and targets a list of them")
+    props = params.get("properties", {})
+    if isinstance(props, list):
+        if len(props) != len(targets):
+            raise ValueError(f"properties has {len(props)} entries but {len(targets)} targets were given")
+    else:
+        props = [props]
+    for entry in props:
+        if not isinstance(entry, dict):
+            raise ValueError("properties must be an object or one object per target")
+        for path in entry:
+            if not _PATH.fullmatch(path):
+                raise ValueError(f"Invalid property path '{path}'")
+    for key in TRANSFORMS:
+        if params.get(key) is not None:
+            values = np.asarray(params[key], dtype=np.float32)
+            if values.shape not in ((3,), (len(targets), 3)):
+                raise ValueError(f"{key} must be [x, y, z] or one [x, y, z] per target")
+            if not np.isfinite(values).all():
+                raise ValueError(f"{key} contains NaN or infinite values")
+            params[key] = values
+    return dict(cmd, params=params)
+
+def _apply_transforms(objects, transforms):
+    """Write transform arrays, through a single foreach_get/foreach_set of bpy.data.objects for large sets.
+
+    foreach_set bypasses RNA updates, so the objects written that way are
+    returned for the caller to tag; an empty list otherwise.
+    """
+    if not transforms or not objects:
+        return []
+    all_objects = bpy.data.objects
+    if len(objects) * 8 < len(all_objects):
+        for key, values in transforms.items():
+            for obj, value in zip(objects, values.tolist()):
+                setattr(obj, TRANSFORMS[key], value)
+        return []
+    index = {obj.name: i for i, obj in enumerate(all_objects)}
+    rows = np.array([index[obj.name] for obj in objects], dtype=np.intp)
+    for key, values in transforms.items():
+        current = np.empty(len(all_objects) * 3, dtype=np.float32)
+        all_objects.foreach_get(TRANSFORMS[key], current)
+        current.reshape(-1, 3)[rows] = values
+        all_objects.foreach_set(TRANSFORMS[key], current)
+    return objects
+
+def set_property(obj, path, value):
+    """Set a dotted property path such as ``location``, ``data.materials[0]`` or ``modifiers["Bevel"].width``.
+
+    A string assigned to a pointer property (e.g. a material slot) is looked up
+    by name in the matching bpy.data collection. Raises ValueError for paths
+    that do not resolve.
+    """
+    if not _PATH.fullmatch(path):
+        raise ValueError(f"Invalid property path '{path}'")
+    tokens = _PATH_TOKEN.findall(path)
+    
+    owner, parent, parent_attr = obj, None, None
+    for name, index in tokens[:-1]:
+        parent, parent_attr = owner, name or parent_attr
+        owner = _step(owner, name, index, path)
+    
+    name, index = tokens[-1]
+    if name:
+        if not hasattr(owner, name):
+            raise ValueError(f"'{path}': {type(owner).__name__} has no property '{name}'")
+        value = _coerce(owner, name, value)
+        setattr(owner, name, value)
+    else:
+        value = _coerce(parent, parent_attr, value)
+        try:
+            owner[_index(index)] = value
+        except (IndexError, KeyError, TypeError) as e:
+            raise ValueError(f"'{path}': {e}")
+
+def _step(owner, name, index, path):
+    try:
+        return getattr(owner, name) if name else owner[_index(index)]
+    except (AttributeError, IndexError, KeyError, TypeError):
+        raise ValueError(f"'{path}': {name or index} not found")
+
+def _index(token):
+    return token[1:-1] if token[:1] in "\"'" else int(token)
+
+def _coerce(owner, attr, value):
+    """Resolve an ID name to the datablock when ``owner.attr`` holds (or collects) pointers to IDs"""
+    if not isinstance(value, str) or owner is None or not hasattr(owner, "bl_rna"):
+        return value
+    prop = owner.bl_rna.properties.get(attr)
+    if prop is None or prop.type not in ('POINTER', 'COLLECTION'):
+        return value
+    type_id = prop.fixed_type.identifier
+    for data_prop in bpy.data.bl_rna.properties:
+        if data_prop.type == 'COLLECTION' and data_prop.fixed_type.identifier == type_id:
+            datablock = getattr(bpy.data, data_prop.identifier).get(value)
+            if datablock is None:
+                raise ValueError(f"{type_id} '{value}' not found")
+            return datablock
+    return value
+
+def decode_modify_object(body, content_type, query):
+    """Build a bulk modify_object command from a NumPy .npz upload (runs on the HTTP thread).
+
+    The archive holds ``targets`` (a string array of object names) and any of
+    ``location``, ``rotation`` and ``scale`` as N x 3 float arrays.
+    """
+    if content_type != "application/x-npz":
+        raise ValueError(f"unsupported content type '{content_type}'")
+    params = {}
+    with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+        if "targets" not in archive:
+            raise ValueError("targets array is required")
+        params["targets"] = [str(name) for name in archive["targets"].tolist()]
+        for key in TRANSFORMS:
+            if key in archive:
+                values = np.asarray(archive[key], dtype=np.float32)
+                if values.shape != (len(params["targets"]), 3):
+                    raise ValueError(f"{key} must have shape ({len(params['targets'])}, 3)")
+                if not np.isfinite(values).all():
+                    raise ValueError(f"{key} contains NaN or infinite values")
+                params[key] = values
+    return {"action": "modify_object", "params": params}
@@ -1,42 +1,39 @@
 import bpy
+import face_groups
+import io
+import itertools
+import logging
+import numpy as np
+
+logger = logging.getLogger("blend_rest.polygon_shape")
 
 def execute_polygon_shape(cmd):
     """Create a custom polygon shape from vertices and faces safely"""
     
     params = cmd.get("params", {})
     vertices = params.get("vertices", [])
-    faces = params.get("faces", [])
+    
+    # Commands from the REST API arrive as checked NumPy arrays (see validate_polygon_shape)
+    if not isinstance(vertices, np.ndarray):
+        try:
+            params = validate_polygon_shape(cmd)["params"]
+        except ValueError as e:
+            logger.error("%s", e)
+            return False
+        vertices = params["vertices"]
+    face_sizes = params["face_sizes"]
+    face_indices = params["face_indices"]
     location = params.get("location", [0, 0, 0])
     name = params.get("name", "PolygonShape")
     
-    if not vertices or not faces:
-        print("[Polygon Shape] Error: vertices and faces arrays are required")
-        return False
+    obj = _create_object(name, location, lambda mesh: _fill_mesh(mesh, vertices, face_sizes, face_indices))
+    if obj:
+        logger.debug("Created '%s' with %d vertices and %d faces", name, len(vertices), len(face_sizes))
+    # Blender appends .001 etc. when the name is taken, so report the name the object got
+    return {"objects": [obj.name]} if obj else False
 
-    
-    # Validate and normalize faces format
-    processed_faces = []
-    max_index = len(vertices) - 1
-    
-    # Check if faces is a single flat list of vertex indices
-    if all(isinstance(f, int) for f in faces):
-        # Convert flat list to a single face containing all vertices
-        processed_faces = [faces]
-    else:
-        # Faces is already in correct format: list of face lists
-        processed_faces = faces
-    
-    # Validate each face
-    for i, face in enumerate(processed_faces):
-        if not isinstance(face, (list, tuple)):
-            print(f"[Polygon Shape] Error: face {i} must be a list/tuple of vertex indices")
-            return False
-        if any(v > max_index or v < 0 for v in face):
-            print(f"[Polygon Shape] Error: face {i} references invalid vertex index")
-            return False
-    
-    faces = processed_faces
-    
+def _create_object(name, location, fill):
+    """Create, link and activate a mesh object whose geometry is written by ``fill(mesh)``"""
     # Create mesh and object
     mesh = bpy.data.meshes.new(name)
     obj = bpy.data.objects.new(name, mesh)
@@ -56,17 +53,148 @@ def execute_polygon_shape(cmd):
     
     # Create mesh safely
     try:
-        mesh.from_pydata(vertices, [], faces)
-        mesh.update(calc_edges=True)
+        fill(mesh)
     except Exception as e:
-        print(f"[Polygon Shape] Failed to create mesh: {e}")
+        logger.error("Could not create mesh: %s", e)
         bpy.data.objects.remove(obj)
         bpy.data.meshes.remove(mesh)
-        return False
+        return None
+    
+    # A new mesh may reuse the address of a deleted one the cache still holds
+    face_groups.invalidate(mesh)
     
     # Select and activate
     obj.select_set(True)
     bpy.context.view_layer.objects.active = obj
+    return obj
+
+def _fill_mesh(mesh, vertices, face_sizes, face_indices):
+    """Write validated vertex/face arrays straight into mesh data without Python per-element objects"""
+    loop_starts = np.zeros(len(face_sizes), dtype=np.int32)
+    np.cumsum(face_sizes[:-1], out=loop_starts[1:])
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    mesh.loops.add(len(face_indices))
+    mesh.loops.foreach_set("vertex_index", face_indices)
+    mesh.polygons.add(len(face_sizes))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        # Derived from loop_start (and read-only) since Blender 4.0
+        mesh.polygons.foreach_set("loop_total", face_sizes)
+    mesh.update(calc_edges=True)
+
+def validate_mesh_arrays(vertices, face_sizes, face_indices):
+    """Vectorized checks of mesh buffers; raises ValueError describing the first problem"""
+    if vertices.ndim != 2 or vertices.shape[1] != 3:
+        raise ValueError("vertices must have shape (N, 3)")
+    if not len(vertices) or not len(face_sizes):
+        raise ValueError("vertices and faces are required")
+    if not np.isfinite(vertices).all():
+        raise ValueError("vertices contain NaN or infinite coordinates")
+    if face_sizes.min() < 3:
+        raise ValueError(f"face {int(np.argmax(face_sizes < 3))} has fewer than 3 vertices")
+    if int(face_sizes.sum(dtype=np.int64)) != len(face_indices):
+        raise ValueError(f"face sizes add up to {int(face_sizes.sum(dtype=np.int64))} but {len(face_indices)} face indices were given")
+    bad = (face_indices < 0) | (face_indices >= len(vertices))
+    if bad.any():
+        face = int(np.searchsorted(np.cumsum(face_sizes), int(np.argmax(bad)), side='right'))
+        raise ValueError(f"face {face} references invalid vertex index")
+
+def validate_polygon_shape(cmd):
+    """Turn JSON ``vertices`` and ``faces`` into the checked arrays binary uploads produce (runs on the HTTP thread)"""
+    params = dict(cmd.get("params") or {})
+    if isinstance(params.get("vertices"), np.ndarray):
+        return cmd  # decoded upload, already checked
+    vertices = params.get("vertices") or []
+    faces = params.pop("faces", None) or []
+    if not len(vertices) or not len(faces):
+        raise ValueError("vertices and faces arrays are required")
     
-    print(f"[Polygon Shape] Created '{name}' with {len(vertices)} vertices and {len(faces)} faces")
-    return True
+    # A flat list of vertex indices is a single face
+    if all(type(f) is int for f in faces):
+        faces = [faces]
+    for i, face in enumerate(faces):
+        # JSON numbers like 1.9 or strings like "1" would otherwise be converted silently; bools are ints too
+        if not isinstance(face, (list, tuple)) or not all(type(v) is int for v in face):
+            raise ValueError(f"face {i} must be a list of integer vertex indices")
+    
+    vertices = _numbers(vertices, "vertices")
+    try:
+        face_sizes = np.fromiter(map(len, faces), dtype=np.int32, count=len(faces))
+        face_indices = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.int32,
+                                   count=int(face_sizes.sum(dtype=np.int64)))
+    except OverflowError:
+        raise ValueError("vertex indices must fit in 32 bits") from None
+    validate_mesh_arrays(vertices, face_sizes, face_indices)
+    
+    params.update(vertices=vertices, face_sizes=face_sizes, face_indices=face_indices)
+    if "location" in params:
+        location = _numbers(params["location"], "location")
+        if location.shape != (3,) or not np.isfinite(location).all():
+            raise ValueError("location must be [x, y, z]")
+        params["location"] = location.tolist()
+    return dict(cmd, params=params)
+
+def _numbers(value, name):
+    """``value`` as a float32 array; raises ValueError unless it holds only numbers"""
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an array of [x, y, z] numbers") from None
+    if array.dtype.kind not in "iuf":
+        raise ValueError(f"{name} must hold numbers")
+    return array.astype(np.float32)
+
+def decode_polygon_shape(body, content_type, query):
+    """Build a polygon_shape command from a binary upload (runs on the HTTP thread).
+
+    ``application/x-npz``: a NumPy .npz archive holding ``vertices`` (N x 3) and
+    either ``faces`` (F x K, for meshes of K-gons) or ``face_sizes`` (F) plus the
+    concatenated ``face_indices``.
+
+    ``application/octet-stream``: little-endian float32 ``vertices`` (N x 3),
+    then int32 ``face_sizes`` (F), then int32 ``face_indices`` filling the rest
+    of the body, with N and F given as ``vertex_count`` and ``face_count``.
+
+    ``name`` and ``location`` (``x,y,z``) are read from the query string.
+    """
+    if content_type == "application/x-npz":
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            vertices = np.asarray(archive["vertices"], dtype=np.float32)
+            if "faces" in archive:
+                faces = np.asarray(archive["faces"], dtype=np.int32)
+                if faces.ndim != 2:
+                    raise ValueError("faces must have shape (F, K); use face_sizes/face_indices for mixed polygons")
+                face_sizes = np.full(len(faces), faces.shape[1], dtype=np.int32)
+                face_indices = faces.ravel()
+            else:
+                face_sizes = np.asarray(archive["face_sizes"], dtype=np.int32)
+                face_indices = np.asarray(archive["face_indices"], dtype=np.int32)
+    elif content_type == "application/octet-stream":
+        vertex_count = int(query["vertex_count"][0])
+        face_count = int(query["face_count"][0])
+        header = 4 * (3 * vertex_count + face_count)
+        if vertex_count < 0 or face_count < 0 or header > len(body) or (len(body) - header) % 4:
+            raise ValueError("body size does not match vertex_count and face_count")
+        vertices = np.frombuffer(body, dtype="<f4", count=3 * vertex_count).reshape(-1, 3)
+        face_sizes = np.frombuffer(body, dtype="<i4", count=face_count, offset=12 * vertex_count)
+        face_indices = np.frombuffer(body, dtype="<i4", offset=header)
+    else:
+        raise ValueError(f"unsupported content type '{content_type}'")
+
+    vertices = vertices.astype(np.float32, copy=False)
+    face_sizes = face_sizes.astype(np.int32, copy=False)
+    face_indices = face_indices.astype(np.int32, copy=False)
+    validate_mesh_arrays(vertices, face_sizes, face_indices)
+
+    params = {
+        "name": query.get("name", ["PolygonShape"])[0],
+        "location": [float(v) for v in query.get("location", ["0,0,0"])[0].split(",")],
+        "vertices": vertices,
+        "face_sizes": face_sizes,
+        "face_indices": face_indices,
+    }
+    if len(params["location"]) != 3:
+        raise ValueError("location must be x,y,z")
+    return {"action": "polygon_shape", "params": params}
@@ -0,0 +1,211 @@
+import bpy
+import bmesh
+import hashlib
+import json
+import math
+import mathutils
+from collections import OrderedDict
+
+# Parameters each primitive accepts, with the defaults of the matching bpy.ops.mesh.primitive_*_add operator
+PRIMITIVE_PARAMS = {
+    "cube": {"size": 2.0},
+    "cylinder": {"vertices": 32, "radius": 1.0, "depth": 2.0, "end_fill_type": 'NGON'},
+    "uv_sphere": {"segments": 32, "ring_count": 16, "radius": 1.0},
+    "ico_sphere": {"subdivisions": 2, "radius": 1.0},
+    "cone": {"vertices": 32, "radius1": 1.0, "radius2": 0.0, "depth": 2.0, "end_fill_type": 'NGON'},
+    "torus": {"major_segments": 48, "minor_segments": 12, "major_radius": 1.0, "minor_radius": 0.25},
+    "plane": {"size": 2.0},
+}
+
+# Type and range of each primitive parameter, as the primitive_*_add operators clamp them
+# (MESH_ADD_VERTS_MAXI and OBJECT_ADD_SIZE_MAXF in Blender's source); bmesh.ops takes any value
+PARAM_LIMITS = {
+    "size": (float, 0.0, 1e12),
+    "radius": (float, 0.0, 1e12),
+    "radius1": (float, 0.0, 1e12),
+    "radius2": (float, 0.0, 1e12),
+    "depth": (float, 0.0, 1e12),
+    "vertices": (int, 3, 10000000),
+    "segments": (int, 3, 100000),
+    "ring_count": (int, 3, 100000),
+    "subdivisions": (int, 1, 10),
+    "major_segments": (int, 3, 256),
+    "minor_segments": (int, 3, 256),
+    "major_radius": (float, 0.0, 10000.0),
+    "minor_radius": (float, 0.0, 10000.0),
+}
+END_FILL_TYPES = ("NOTHING", "NGON", "TRIFAN")
+
+# Object names the primitive_*_add operators give new objects
+DEFAULT_NAMES = {
+    "cube": "Cube",
+    "cylinder": "Cylinder",
+    "uv_sphere": "Sphere",
+    "ico_sphere": "Icosphere",
+    "cone": "Cone",
+    "torus": "Torus",
+    "plane": "Plane",
+}
+
+# Operator options that have no meaning when building mesh data directly
+IGNORED_PARAMS = {"align", "enter_editmode"}
+
+# Template meshes kept for reuse; the least recently used one is removed beyond this
+TEMPLATE_CACHE_SIZE = 64
+
+# Names of the template meshes built or reused this session, least recently used first
+_templates = OrderedDict()
+
+def primitive_params(typ, params):
+    """Merge ``params`` over the defaults of primitive ``typ``.
+
+    Raises ValueError for unknown types or parameters and for values outside
+    PARAM_LIMITS, so nothing the operators would have clamped reaches bmesh.ops.
+    """
+    if typ not in PRIMITIVE_PARAMS:
+        raise ValueError(f"Unsupported primitive type '{typ}'")
+    unknown = set(params) - set(PRIMITIVE_PARAMS[typ]) - IGNORED_PARAMS - {"calc_uvs"}
+    if unknown:
+        raise ValueError(f"Unsupported {typ} parameters: {', '.join(sorted(unknown))}")
+    merged = dict(PRIMITIVE_PARAMS[typ])
+    merged.update((k, v) for k, v in params.items() if k not in IGNORED_PARAMS)
+    merged.setdefault("calc_uvs", True)
+    for key, value in merged.items():
+        if key in PARAM_LIMITS:
+            kind, minimum, maximum = PARAM_LIMITS[key]
+            merged[key] = number(value, key, integer=kind is int, minimum=minimum, maximum=maximum)
+    if "end_fill_type" in merged and merged["end_fill_type"] not in END_FILL_TYPES:
+        raise ValueError(f"end_fill_type must be one of {', '.join(END_FILL_TYPES)}, got {merged['end_fill_type']!r}")
+    if not isinstance(merged["calc_uvs"], bool):
+        raise ValueError("calc_uvs must be true or false")
+    return merged
+
+def vector3(value, name):
+    """``value`` as a tuple of three finite floats; raises ValueError naming ``name`` otherwise"""
+    try:
+        x, y, z = (float(v) for v in value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be [x, y, z]") from None
+    if not all(math.isfinite(v) for v in (x, y, z)):
+        raise ValueError(f"{name} contains NaN or infinite values")
+    return (x, y, z)
+
+def number(value, name, integer=False, minimum=None, maximum=None):
+    """``value`` as a finite float (an int when ``integer``) within ``minimum``..``maximum``; raises ValueError naming ``name`` otherwise"""
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValueError(f"{name} must be {'an integer' if integer else 'a number'}, got {value!r}")
+    if not integer:
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"{name} must be finite")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, got {value!r}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{name} must be at most {maximum:g}, got {value!r}")
+    return value
+
+def build_primitive(bm, typ, params=None, matrix=None):
+    """Add the geometry of primitive ``typ`` to ``bm`` with bmesh.ops, without operators or context.
+
+    ``params`` use the names of the bpy.ops.mesh.primitive_*_add operators and
+    ``matrix`` (default identity) transforms the new geometry.
+    """
+    p = primitive_params(typ, params or {})
+    matrix = matrix if matrix is not None else mathutils.Matrix.Identity(4)
+    calc_uvs = bool(p.pop("calc_uvs"))
+    if calc_uvs:
+        bm.loops.layers.uv.verify()
+
+    if typ == "cube":
+        bmesh.ops.create_cube(bm, size=p["size"], matrix=matrix, calc_uvs=calc_uvs)
+    elif typ in ("cylinder", "cone"):
+        radius1, radius2 = (p["radius"], p["radius"]) if typ == "cylinder" else (p["radius1"], p["radius2"])
+        bmesh.ops.create_cone(
+            bm, cap_ends=p["end_fill_type"] != 'NOTHING', cap_tris=p["end_fill_type"] == 'TRIFAN',
+            segments=p["vertices"], radius1=radius1, radius2=radius2, depth=p["depth"],
+            matrix=matrix, calc_uvs=calc_uvs)
+    elif typ == "uv_sphere":
+        bmesh.ops.create_uvsphere(
+            bm, u_segments=p["segments"], v_segments=p["ring_count"], radius=p["radius"],
+            matrix=matrix, calc_uvs=calc_uvs)
+    elif typ == "ico_sphere":
+        bmesh.ops.create_icosphere(
+            bm, subdivisions=p["subdivisions"], radius=p["radius"], matrix=matrix, calc_uvs=calc_uvs)
+    elif typ == "plane":
+        # The plane operator builds a one-cell grid whose size is half its width
+        bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=p["size"] / 2, matrix=matrix, calc_uvs=calc_uvs)
+    elif typ == "torus":
+        _build_torus(bm, p["major_segments"], p["minor_segments"], p["major_radius"], p["minor_radius"], matrix, calc_uvs)
+
+def template_mesh(typ, params=None):
+    """Return the shared template mesh for a primitive and parameter set, building it on first use.
+
+    Templates are named after a hash of their parameters and start with a dot
+    to stay out of the way in UI lists. Only the TEMPLATE_CACHE_SIZE most
+    recently used are kept, and they have no fake user, so they are not saved
+    with the file. They must not be edited; instance them with
+    ``instance_mesh``.
+    """
+    p = primitive_params(typ, params or {})
+    digest = hashlib.blake2b(json.dumps([typ, p], sort_keys=True).encode(), digest_size=4).hexdigest()
+    name = f".{DEFAULT_NAMES[typ]}Template.{digest}"
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None:
+        mesh = bpy.data.meshes.new(name)
+        bm = bmesh.new()
+        try:
+            build_primitive(bm, typ, p)
+            bm.to_mesh(mesh)
+        except Exception:
+            bpy.data.meshes.remove(mesh)
+            raise
+        finally:
+            bm.free()
+    # Files saved by earlier versions kept their templates with a fake user
+    mesh.use_fake_user = False
+    _templates[name] = None
+    _templates.move_to_end(name)
+    while len(_templates) > TEMPLATE_CACHE_SIZE:
+        stale = bpy.data.meshes.get(_templates.popitem(last=False)[0])
+        # A template still linked (e.g. by the cutters of a running boolean) is left for Blender to drop on save
+        if stale is not None and stale.users == 0:
+            bpy.data.meshes.remove(stale)
+    return mesh
+
+def instance_mesh(template, name):
+    """Copy of a template mesh that objects can own and edit"""
+    mesh = template.copy()
+    mesh.name = name
+    return mesh
+
+def primitive_matrix(location=(0, 0, 0), rotation=(0, 0, 0), scale=(1, 1, 1)):
+    """World matrix for a location, XYZ Euler rotation in radians and scale"""
+    return mathutils.Matrix.LocRotScale(
+        mathutils.Vector(location), mathutils.Euler(rotation, 'XYZ'), mathutils.Vector(scale))
+
+def _build_torus(bm, major_segments, minor_segments, major_radius, minor_radius, matrix, calc_uvs):
+    """Torus around Z as quads, laid out like primitive_torus_add (no bmesh operator exists for it)"""
+    verts = []
+    for i in range(major_segments):
+        angle = 2 * math.pi * i / major_segments
+        ring_matrix = mathutils.Matrix.Rotation(angle, 4, 'Z')
+        for j in range(minor_segments):
+            minor_angle = 2 * math.pi * j / minor_segments
+            co = mathutils.Vector((major_radius + minor_radius * math.cos(minor_angle), 0.0,
+                                   minor_radius * math.sin(minor_angle)))
+            verts.append(bm.verts.new(matrix @ (ring_matrix @ co)))
+
+    uv_layer = bm.loops.layers.uv.active if calc_uvs else None
+    for i in range(major_segments):
+        next_i = (i + 1) % major_segments
+        for j in range(minor_segments):
+            next_j = (j + 1) % minor_segments
+            face = bm.faces.new((
+                verts[i * minor_segments + j], verts[next_i * minor_segments + j],
+                verts[next_i * minor_segments + next_j], verts[i * minor_segments + next_j]))
+            if uv_layer is not None:
+                u0, u1 = i / major_segments, (i + 1) / major_segments
+                v0, v1 = j / minor_segments, (j + 1) / minor_segments
+                for loop, uv in zip(face.loops, ((u0, v0), (u1, v0), (u1, v1), (u0, v1))):
+                    loop[uv_layer].uv = uv
+    bm.normal_update()
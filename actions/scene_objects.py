@@ -0,0 +1,29 @@
+import bpy
+from contextlib import contextmanager
+
+class ObjectNotFound(LookupError):
+    """A client named an object that does not exist; the REST handlers answer 404"""
+
+# Scene whose objects target names resolve to while a session's command runs; None means the whole file
+_scene = None
+
+def get(name):
+    """The object a command may target by ``name``, or None.
+
+    Inside a session only the objects of the session scene are visible, so
+    a name taken by another session's object is not found rather than
+    silently resolving to it.
+    """
+    if _scene is None:
+        return bpy.data.objects.get(name)
+    return _scene.objects.get(name)
+
+@contextmanager
+def restricted(scene):
+    """Resolve target names in ``scene`` only (None leaves lookups file-wide)"""
+    global _scene
+    previous, _scene = _scene, scene
+    try:
+        yield
+    finally:
+        _scene = previous
@@ -1,10 +1,18 @@
 import bpy
+import history
+import face_groups
+import logging
 import bmesh
-import mathutils
+import mesh_buffers
+import numpy as np
+import primitives
+import scene_objects
+
+logger = logging.getLogger("blend_rest.select_faces")
 
 def execute_select_faces(cmd):
     """Select specific faces on an object"""
-    bpy.ops.ed.undo_push(message="Original")
+    history.push("Original")
     # Select specific faces on an object
     select_params = cmd.get("params", {})
     target_object = select_params.get("target")  # Object to select faces on
@@ -12,9 +20,9 @@ def execute_select_faces(cmd):
     faces_set_index = select_params.get("faces_set_index")  # Specific ring index to select
 
     # Get the target object
-    obj = bpy.data.objects.get(target_object)
+    obj = scene_objects.get(target_object)
     if not obj:
-        print(f"Error: Object '{target_object}' not found")
+        logger.error("Object '%s' not found", target_object)
         return False
 
     # Ensure proper mode
@@ -24,18 +32,19 @@ def execute_select_faces(cmd):
     bpy.ops.object.select_all(action='DESELECT')
     obj.select_set(True)
     bpy.context.view_layer.objects.active = obj
+
+    # Mesh data is current in object mode, so ring groups are computed and the
+    # new selection written there with foreach_get/foreach_set before editing
+    if faces_set_index is not None:
+        select_faces_by_ring_criterion(obj.data, faces_set_index)
+    else:
+        set_face_selection(obj.data, np.zeros(len(obj.data.polygons), dtype=bool))
     bpy.ops.object.mode_set(mode='EDIT')
 
     bm = bmesh.from_edit_mesh(obj.data)
     bm.faces.ensure_lookup_table()
 
-    # Clear selection
-    for face in bm.faces:
-        face.select = False
-
-    if faces_set_index is not None:
-        select_faces_by_ring_criterion(bm, faces_set_index)
-    else:
+    if faces_set_index is None:
         # Default behavior
         for face in bm.faces:
             if len(face.verts) == 4:
@@ -45,150 +54,39 @@ def execute_select_faces(cmd):
             filter_faces_by_side(bm, obj, side_type)
 
     bmesh.update_edit_mesh(obj.data)
-    bpy.ops.ed.undo_push(message=f"Selected set {faces_set_index}" if faces_set_index is not None else f"Selected {side_type} faces")
+    history.push(f"Selected set {faces_set_index}" if faces_set_index is not None else f"Selected {side_type} faces")
     return True
 
-def select_faces_by_ring_criterion(bm, set_index):
+def select_faces_by_ring_criterion(mesh, set_index):
     """Select faces based on multiple bisect planes"""
-    # Ensure lookup tables are up to date
-    bm.verts.ensure_lookup_table()
-    bm.edges.ensure_lookup_table()
-    bm.faces.ensure_lookup_table()
-    
-    # Get all quad faces
-    quad_faces = [face for face in bm.faces if len(face.verts) == 4]
-    print(f"Found {len(quad_faces)} quad faces")
-    
-    if not quad_faces:
-        print("No quad faces found - cannot perform ring selection")
-        return
-    
-    # Find vertices that are part of rings (connected to 4 faces)
-    ring_vertices = [vert for vert in bm.verts if len(vert.link_faces) == 4]
-    print(f"Found {len(ring_vertices)} ring vertices")
-    
-    if not ring_vertices:
-        print("No ring vertices found")
-        return
-    
-    # Find edges connecting ring vertices (bisect edges)
-    ring_edges = []
-    for edge in bm.edges:
-        if all(vert in ring_vertices for vert in edge.verts):
-            ring_edges.append(edge)
-    
-    print(f"Found {len(ring_edges)} ring edges")
-    
-    if not ring_edges:
-        print("No ring edges found")
-        return
-    
-    # Determine cylinder's main axis
-    bbox_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
-    bbox_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
-    
-    for face in quad_faces:
-        for vert in face.verts:
-            bbox_min.x = min(bbox_min.x, vert.co.x)
-            bbox_min.y = min(bbox_min.y, vert.co.y)
-            bbox_min.z = min(bbox_min.z, vert.co.z)
-            bbox_max.x = max(bbox_max.x, vert.co.x)
-            bbox_max.y = max(bbox_max.y, vert.co.y)
-            bbox_max.z = max(bbox_max.z, vert.co.z)
-    
-    bbox_size = bbox_max - bbox_min
-    cylinder_axis = max(range(3), key=lambda i: bbox_size[i])
-    print(f"Cylinder main axis: {cylinder_axis}")
-    
-    # Group ring edges by their position along the cylinder axis
-    # This separates different bisect operations
-    edge_groups = {}
-    for edge in ring_edges:
-        vert1, vert2 = edge.verts
-        center = (vert1.co + vert2.co) / 2
-        position = center[cylinder_axis]
-        
-        # Group edges with similar positions (same bisect operation)
-        group_key = round(position, 4)  # 4 decimal places precision
-        if group_key not in edge_groups:
-            edge_groups[group_key] = []
-        edge_groups[group_key].append(edge)
-    
-    print(f"Found {len(edge_groups)} distinct ring groups")
-    
-    # Calculate average position for each ring group (bisect plane position)
-    ring_positions = []
-    for group_key, edges in edge_groups.items():
-        positions = []
-        for edge in edges:
-            vert1, vert2 = edge.verts
-            center = (vert1.co + vert2.co) / 2
-            positions.append(center[cylinder_axis])
-        
-        avg_pos = sum(positions) / len(positions)
-        ring_positions.append(avg_pos)
-    
-    # Sort ring positions along the cylinder axis
-    ring_positions.sort()
-    print(f"Ring positions along axis {cylinder_axis}: {ring_positions}")
-    
-    # Create face groups based on segments between ring positions
-    face_groups = []
-    
-    if ring_positions:
-        # Add group before first ring
-        group_before = []
-        for face in quad_faces:
-            face_center = face.calc_center_median()
-            if face_center[cylinder_axis] < ring_positions[0]:
-                group_before.append(face.index)
-        if group_before:
-            face_groups.append(group_before)
-        
-        # Add groups between rings
-        for i in range(len(ring_positions) - 1):
-            group_between = []
-            for face in quad_faces:
-                face_center = face.calc_center_median()
-                if ring_positions[i] <= face_center[cylinder_axis] < ring_positions[i + 1]:
-                    group_between.append(face.index)
-            if group_between:
-                face_groups.append(group_between)
-        
-        # Add group after last ring
-        group_after = []
-        for face in quad_faces:
-            face_center = face.calc_center_median()
-            if face_center[cylinder_axis] >= ring_positions[-1]:
-                group_after.append(face.index)
-        if group_after:
-            face_groups.append(group_after)
-    else:
-        # Fallback: single group if no rings found
-        face_groups.append([face.index for face in quad_faces])
-    
-    print(f"Created {len(face_groups)} face groups")
-    for i, group in enumerate(face_groups):
-        print(f"  Group {i}: {len(group)} faces")
-    
+    # Successive faces_set_index calls on an unchanged mesh reuse the same groups
+    index = face_groups.face_group_index(mesh)
+    groups = index["groups"]
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %d face groups of %s faces", "Reused" if index["cached"] else "Created", len(groups),
+                     ", ".join(str(len(group)) for group in groups))
+
     # Select the requested set
-    if 0 <= set_index < len(face_groups):
-        # Clear all selections first
-        for face in bm.faces:
-            face.select = False
-        
-        bm.faces.ensure_lookup_table()
-        
-        for face_idx in face_groups[set_index]:
-            try:
-                bm.faces[face_idx].select = True
-            except IndexError:
-                print(f"Warning: Face index {face_idx} not found in bmesh")
-                continue
-        
-        print(f"Selected set {set_index} with {len(face_groups[set_index])} faces")
+    selection = np.zeros(len(mesh.polygons), dtype=bool)
+    if 0 <= set_index < len(groups):
+        selection[groups[set_index]] = True
+        logger.debug("Selected set %d with %d faces", set_index, len(groups[set_index]))
     else:
-        print(f"Set index {set_index} out of range (0-{len(face_groups)-1})")
+        logger.warning("Set index %d out of range (0-%d)", set_index, len(groups) - 1)
+    set_face_selection(mesh, selection)
+
+def set_face_selection(mesh, face_selection):
+    """Select exactly the given faces together with their edges and vertices (object mode)"""
+    loop_totals = mesh_buffers.read(mesh.polygons, "loop_total", np.int32)
+    selected_loops = np.repeat(face_selection, loop_totals)
+    vert_selection = np.zeros(len(mesh.vertices), dtype=bool)
+    vert_selection[mesh_buffers.read(mesh.loops, "vertex_index", np.int32)[selected_loops]] = True
+    edge_selection = np.zeros(len(mesh.edges), dtype=bool)
+    edge_selection[mesh_buffers.read(mesh.loops, "edge_index", np.int32)[selected_loops]] = True
+    mesh.polygons.foreach_set("select", face_selection)
+    mesh.edges.foreach_set("select", edge_selection)
+    mesh.vertices.foreach_set("select", vert_selection)
 
 def filter_faces_by_side(bm, obj, side_type):
     """Filter faces based on external/internal criteria"""
@@ -209,3 +107,14 @@ def filter_faces_by_side(bm, obj, side_type):
             should_select = True
             
         face.select = should_select
+
+def validate_select_faces(cmd):
+    """Check the target, side and set index before the command is queued (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    if not isinstance(p.get("target"), str):
+        raise ValueError("target must be an object name")
+    if p.get("side", "all") not in ("external", "internal", "all"):
+        raise ValueError(f"side must be 'external', 'internal' or 'all', got {p['side']!r}")
+    if p.get("faces_set_index") is not None:
+        p["faces_set_index"] = primitives.number(p["faces_set_index"], "faces_set_index", integer=True, minimum=0)
+    return dict(cmd, params=p)
@@ -1,4 +1,8 @@
 import bpy
+import logging
+import primitives
+
+logger = logging.getLogger("blend_rest.setup_scene")
 
 def execute_setup_scene(cmd):
     """Setup Blender scene for small-scale modeling (0-300 mm)"""
@@ -15,7 +19,7 @@ def execute_setup_scene(cmd):
     scene.unit_settings.scale_length = unit_scale
     scene.unit_settings.length_unit = 'MILLIMETERS'
 
-    print(f"[Setup Scene] Units set: 1 Blender Unit = {1/unit_scale} mm")
+    logger.debug("Units set: 1 Blender Unit = %s mm", 1 / unit_scale)
 
     # --- 2. Adjust 3D viewports safely ---
     found_viewport = False
@@ -29,17 +33,29 @@ def execute_setup_scene(cmd):
                         space.clip_start = clip_start
                         space.clip_end = clip_end
                         space.overlay.grid_scale = grid_scale
-                        print(f"[Setup Scene] Updated VIEW_3D area: clip={clip_start}-{clip_end}, grid={grid_scale}")
+                        logger.debug("Updated VIEW_3D area: clip=%s-%s, grid=%s", clip_start, clip_end, grid_scale)
 
     if not found_viewport:
-        print("[Setup Scene] ⚠ No VIEW_3D area found — skipped viewport adjustments.")
+        logger.debug("No VIEW_3D area found, skipped viewport adjustments")
 
     # --- 3. Adjust camera if present ---
     if scene.camera:
         cam = scene.camera.data
         cam.clip_start = clip_start
         cam.clip_end = clip_end
-        print(f"[Setup Scene] Camera '{scene.camera.name}' clip range set: {clip_start}-{clip_end}")
+        logger.debug("Camera '%s' clip range set: %s-%s", scene.camera.name, clip_start, clip_end)
 
-    print("[Setup Scene] Scene setup complete for small-scale modeling.")
+    logger.debug("Scene setup complete for small-scale modeling")
     return True
+
+def validate_setup_scene(cmd):
+    """Check that scale, clipping and grid values are positive numbers (runs on the HTTP thread)"""
+    p = dict(cmd.get("params") or {})
+    for key in ("unit_scale", "clip_start", "clip_end", "grid_scale"):
+        if key in p:
+            p[key] = primitives.number(p[key], key)
+            if p[key] <= 0:
+                raise ValueError(f"{key} must be positive, got {p[key]!r}")
+    if p.get("clip_start", 0.1) >= p.get("clip_end", 10000):
+        raise ValueError("clip_start must be less than clip_end")
+    return dict(cmd, params=p)
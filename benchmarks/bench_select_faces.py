@@ -0,0 +1,201 @@
+"""Compare the BMesh and NumPy ring grouping of select_faces on generated bisected cylinders.
+
+The ``cached s`` column times a face_group_index lookup on an unchanged mesh.
+
+Runs outside Blender against the stand-ins in ``fake_blender``:
+
+    python benchmarks/bench_select_faces.py [--max-faces 200000] [--repeat 3]
+
+The BMesh reference is quadratic, so it is only timed up to ``--reference-faces``.
+Every size it runs on checks that both produce identical groups.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "fake_blender"), os.path.join(HERE, "..", "actions")]
+
+import bmesh  # noqa: E402
+import bpy  # noqa: E402
+import face_groups  # noqa: E402
+import mathutils  # noqa: E402
+
+def bisected_cylinder(segments, rings, radius=1.0, depth=2.0, seed=0):
+    """A capped cylinder cut by ``rings`` bisect planes at irregular heights along Z"""
+    rng = np.random.default_rng(seed)
+    heights = np.sort(np.concatenate([[-depth / 2, depth / 2], rng.uniform(-depth / 2, depth / 2, rings)]))
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    circle = np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=1)
+    vertices = np.concatenate([np.column_stack([circle, np.full(segments, z)]) for z in heights])
+
+    faces = []
+    for row in range(len(heights) - 1):
+        bottom, top = row * segments, (row + 1) * segments
+        for i in range(segments):
+            j = (i + 1) % segments
+            faces.append([bottom + i, bottom + j, top + j, top + i])
+    faces.append(list(range(segments - 1, -1, -1)))
+    faces.append(list(range(len(vertices) - segments, len(vertices))))
+    return bpy.Mesh("Cylinder", vertices, faces)
+
+def best_of(repeat, func, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def reference_groups(mesh):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    return ring_face_groups_bmesh(bm)
+
+def ring_face_groups_bmesh(bm):
+    """Reference BMesh implementation of face_groups.ring_face_groups, one Python step per element.
+
+    This is the grouping select_faces used before it was vectorized; the
+    benchmark times it and checks the NumPy version against it.
+    """
+    # Ensure lookup tables are up to date
+    bm.verts.ensure_lookup_table()
+    bm.edges.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+    
+    # Get all quad faces
+    quad_faces = [face for face in bm.faces if len(face.verts) == 4]
+    
+    if not quad_faces:
+        return []
+    
+    # Find vertices that are part of rings (connected to 4 faces)
+    ring_vertices = [vert for vert in bm.verts if len(vert.link_faces) == 4]
+    
+    if not ring_vertices:
+        return []
+    
+    # Find edges connecting ring vertices (bisect edges)
+    ring_edges = []
+    for edge in bm.edges:
+        if all(vert in ring_vertices for vert in edge.verts):
+            ring_edges.append(edge)
+    
+    if not ring_edges:
+        return []
+    
+    # Determine cylinder's main axis
+    bbox_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
+    bbox_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
+    
+    for face in quad_faces:
+        for vert in face.verts:
+            bbox_min.x = min(bbox_min.x, vert.co.x)
+            bbox_min.y = min(bbox_min.y, vert.co.y)
+            bbox_min.z = min(bbox_min.z, vert.co.z)
+            bbox_max.x = max(bbox_max.x, vert.co.x)
+            bbox_max.y = max(bbox_max.y, vert.co.y)
+            bbox_max.z = max(bbox_max.z, vert.co.z)
+    
+    bbox_size = bbox_max - bbox_min
+    cylinder_axis = max(range(3), key=lambda i: bbox_size[i])
+    
+    # Group ring edges by their position along the cylinder axis
+    # This separates different bisect operations
+    edge_groups = {}
+    for edge in ring_edges:
+        vert1, vert2 = edge.verts
+        center = (vert1.co + vert2.co) / 2
+        position = center[cylinder_axis]
+        
+        # Group edges with similar positions (same bisect operation)
+        group_key = round(position, 4)  # 4 decimal places precision
+        if group_key not in edge_groups:
+            edge_groups[group_key] = []
+        edge_groups[group_key].append(edge)
+    
+    # Calculate average position for each ring group (bisect plane position)
+    ring_positions = []
+    for group_key, edges in edge_groups.items():
+        positions = []
+        for edge in edges:
+            vert1, vert2 = edge.verts
+            center = (vert1.co + vert2.co) / 2
+            positions.append(center[cylinder_axis])
+        
+        avg_pos = sum(positions) / len(positions)
+        ring_positions.append(avg_pos)
+    
+    # Sort ring positions along the cylinder axis
+    ring_positions.sort()
+    
+    # Create face groups based on segments between ring positions
+    face_groups = []
+    
+    if ring_positions:
+        # Add group before first ring
+        group_before = []
+        for face in quad_faces:
+            face_center = face.calc_center_median()
+            if face_center[cylinder_axis] < ring_positions[0]:
+                group_before.append(face.index)
+        if group_before:
+            face_groups.append(group_before)
+        
+        # Add groups between rings
+        for i in range(len(ring_positions) - 1):
+            group_between = []
+            for face in quad_faces:
+                face_center = face.calc_center_median()
+                if ring_positions[i] <= face_center[cylinder_axis] < ring_positions[i + 1]:
+                    group_between.append(face.index)
+            if group_between:
+                face_groups.append(group_between)
+        
+        # Add group after last ring
+        group_after = []
+        for face in quad_faces:
+            face_center = face.calc_center_median()
+            if face_center[cylinder_axis] >= ring_positions[-1]:
+                group_after.append(face.index)
+        if group_after:
+            face_groups.append(group_after)
+    else:
+        # Fallback: single group if no rings found
+        face_groups.append([face.index for face in quad_faces])
+    
+    return face_groups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-faces", type=int, default=200000)
+    parser.add_argument("--reference-faces", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'segments':>8} {'rings':>5} {'faces':>8} {'groups':>6} {'bmesh s':>9} {'numpy s':>9} {'cached s':>9} {'speedup':>8}")
+    for segments, rings in [(32, 4), (64, 16), (128, 32), (256, 64), (512, 128), (1024, 192)]:
+        if segments * (rings + 1) > args.max_faces:
+            break
+        mesh = bisected_cylinder(segments, rings)
+        numpy_time, groups = best_of(args.repeat, face_groups.ring_face_groups, mesh)
+        face_groups.face_group_index(mesh)
+        cached_time, _ = best_of(args.repeat, face_groups.face_group_index, mesh)
+        faces = len(mesh.polygons)
+        row = f"{segments:>8} {rings:>5} {faces:>8} {len(groups):>6}"
+        if faces <= args.reference_faces:
+            bmesh_time, expected = best_of(1, reference_groups, mesh)
+            if [list(g) for g in groups] != expected:
+                sys.exit(f"Group mismatch for {segments} segments x {rings} rings")
+            print(f"{row} {bmesh_time:>9.4f} {numpy_time:>9.4f} {cached_time:>9.4f} {bmesh_time / numpy_time:>7.0f}x")
+        else:
+            print(f"{row} {'-':>9} {numpy_time:>9.4f} {cached_time:>9.4f} {'-':>8}")
+
+if __name__ == "__main__":
+    main()
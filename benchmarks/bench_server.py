@@ -0,0 +1,275 @@
+"""Measure Blend-REST's request throughput and latency outside Blender.
+
+Loads the add-on (``__init__.py`` and ``actions/``) against the stand-ins in
+``fake_blender``, runs ``process_commands`` on a thread the way Blender's timer
+would, and drives the HTTP server with synthetic workloads:
+
+    python benchmarks/bench_server.py [--workloads flood,models] [--clients 8] [--requests 2000]
+
+Workloads:
+
+* ``flood``: clients post small ``modify_object`` commands with ``?wait=true``
+* ``enqueue``: the same commands without waiting, then the time to drain the queue
+* ``polygon_json``, ``polygon_npz``: ``polygon_shape`` grids as JSON and as binary uploads
+* ``models``: ``GET /v1/models`` on a large scene in full, revalidated (304) and paged
+* ``select_faces``: ``select_faces`` by ring on a bisected cylinder
+
+Operators do nothing in the stand-ins, so the numbers are Blend-REST's own
+overhead (HTTP, queueing, scheduling, JSON, snapshots and NumPy work) and are
+meant for comparing revisions on one machine.
+"""
+import argparse
+import contextlib
+import http.client
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [os.path.join(HERE, "fake_blender"), HERE]
+
+import bpy  # noqa: E402
+from bench_select_faces import bisected_cylinder  # noqa: E402
+
+# Results are printed here; the add-on's own output is discarded unless --verbose
+RESULTS = sys.stdout
+
+WORKLOADS = ("flood", "enqueue", "polygon_json", "polygon_npz", "models", "select_faces")
+
+def load_addon():
+    """Import the add-on package the way Blender does, as ``blend_rest``"""
+    spec = importlib.util.spec_from_file_location(
+        "blend_rest", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules["blend_rest"] = addon
+    with quiet():
+        spec.loader.exec_module(addon)
+    return addon
+
+class Harness:
+    """The add-on's server on an ephemeral port, with a thread standing in for Blender's timer"""
+
+    def __init__(self, addon, workers):
+        self.addon = addon
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._run_timer, daemon=True)
+        self.server = addon.BlendRESTServer()
+        with quiet():
+            self.server.start_server(port=0, workers=workers)
+        self.port = self.server.server.server_address[1]
+
+    def _run_timer(self):
+        while not self._stop.is_set():
+            # Blender calls the timer again after the delay it returns
+            self._stop.wait(self.addon.process_commands())
+
+    def start(self):
+        self._timer.start()
+
+    def stop(self):
+        self._stop.set()
+        self._timer.join()
+        self.server.stop_server()
+
+    def connect(self):
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+
+    def drained(self, timeout=300.0):
+        deadline = time.perf_counter() + timeout
+        while not self.addon.command_queue.empty() and time.perf_counter() < deadline:
+            time.sleep(0.001)
+
+def quiet():
+    return contextlib.redirect_stdout(open(os.devnull, "w"))
+
+def request(conn, method, path, body=None, headers=None):
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode()
+        headers = dict(headers or {}, **{"Content-Type": "application/json"})
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    data = response.read()
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path} answered {response.status}: {data[:200]!r}")
+    return response.status, data
+
+def run_clients(harness, clients, requests, make_request):
+    """Send ``requests`` requests from ``clients`` keep-alive connections; returns (seconds, latencies)"""
+    latencies = [None] * requests
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    errors = []
+
+    def client():
+        conn = harness.connect()
+        try:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                method, path, body, headers = make_request(i)
+                start = time.perf_counter()
+                request(conn, method, path, body, headers)
+                latencies[i] = time.perf_counter() - start
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return elapsed, latencies
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def report(name, elapsed, latencies, note=""):
+    values = sorted(latencies)
+    ms = [1000 * percentile(values, f) for f in (0.5, 0.9, 0.99)] + [1000 * values[-1]]
+    print(f"{name:<20} {len(values):>8} {len(values) / elapsed:>10.1f} "
+          + " ".join(f"{v:>8.2f}" for v in ms) + (f"  {note}" if note else ""), file=RESULTS, flush=True)
+
+def populate(count, prefix="Object"):
+    """Add ``count`` mesh objects straight to the scene and let the next tick snapshot them"""
+    mesh = bpy.data.meshes.new(f"{prefix}Mesh")
+    collection = bpy.context.scene.collection
+    for i in range(count):
+        obj = bpy.data.objects.new(f"{prefix}{i:06d}", mesh)
+        obj.location = [float(i % 100), float(i // 100 % 100), float(i // 10000)]
+        collection.objects.link(obj)
+
+def grid(size):
+    """A ``size`` x ``size`` vertex grid of quads"""
+    xs, ys = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32))
+    vertices = np.column_stack([xs.ravel(), ys.ravel(), np.zeros(size * size, dtype=np.float32)])
+    index = np.arange(size * size, dtype=np.int32).reshape(size, size)
+    faces = np.stack([index[:-1, :-1], index[:-1, 1:], index[1:, 1:], index[1:, :-1]], axis=-1).reshape(-1, 4)
+    return vertices, faces
+
+def bench_flood(harness, args):
+    objects = [f"Flood{i:06d}" for i in range(args.objects)]
+    elapsed, latencies = run_clients(harness, args.clients, args.requests, lambda i: (
+        "POST", "/v1/commands?wait=true",
+        {"action": "modify_object", "params": {"target": objects[i % len(objects)], "location": [i % 7, 0, 0]}}, None))
+    report("flood", elapsed, latencies)
+
+def bench_enqueue(harness, args):
+    objects = [f"Flood{i:06d}" for i in range(args.objects)]
+    start = time.perf_counter()
+    elapsed, latencies = run_clients(harness, args.clients, args.requests, lambda i: (
+        "POST", "/v1/commands",
+        {"action": "modify_object", "params": {"target": objects[i % len(objects)], "location": [0, i % 7, 0]}}, None))
+    harness.drained()
+    drained = time.perf_counter() - start
+    report("enqueue", elapsed, latencies, f"drained in {drained:.2f} s ({args.requests / drained:.0f} commands/s)")
+
+def bench_polygon(harness, args, binary):
+    vertices, faces = grid(args.grid)
+    if binary:
+        buffer = io.BytesIO()
+        np.savez(buffer, vertices=vertices, faces=faces)
+        body = buffer.getvalue()
+        make = lambda i: ("POST", f"/v1/commands/polygon_shape?wait=true&name=Grid{i}", body,
+                          {"Content-Type": "application/x-npz"})
+    else:
+        body = json.dumps({"action": "polygon_shape",
+                           "params": {"vertices": vertices.tolist(), "faces": faces.tolist()}}).encode()
+        make = lambda i: ("POST", "/v1/commands?wait=true", body, {"Content-Type": "application/json"})
+    count = max(1, args.requests // 100)
+    elapsed, latencies = run_clients(harness, min(args.clients, count), count, make)
+    megabytes = len(body) * count / elapsed / 1e6
+    report("polygon_npz" if binary else "polygon_json", elapsed, latencies,
+           f"{len(vertices)} vertices, {len(body) / 1e6:.1f} MB bodies, {megabytes:.1f} MB/s")
+
+def bench_models(harness, args):
+    conn = harness.connect()
+    conn.request("GET", "/v1/models")
+    response = conn.getresponse()
+    body, etag = response.read(), response.getheader("ETag")
+    conn.close()
+    count = max(1, args.requests // 20)
+    elapsed, latencies = run_clients(harness, args.clients, count, lambda i: ("GET", "/v1/models", None, None))
+    report("models full", elapsed, latencies, f"{len(body) / 1e6:.1f} MB, {len(json.loads(body))} objects")
+    elapsed, latencies = run_clients(harness, args.clients, args.requests,
+                                     lambda i: ("GET", "/v1/models", None, {"If-None-Match": etag}))
+    report("models 304", elapsed, latencies)
+    elapsed, latencies = run_clients(harness, args.clients, args.requests, lambda i: (
+        "GET", f"/v1/models?type=MESH&fields=name,location&limit=100&name_prefix=Scene{i % 10}", None, None))
+    report("models page", elapsed, latencies)
+
+def bench_select_faces(harness, args):
+    mesh = bpy.data.objects["Cylinder"].data
+    groups = args.rings + 1
+    elapsed, latencies = run_clients(harness, 1, args.requests // 10 or 1, lambda i: (
+        "POST", "/v1/commands?wait=true",
+        {"action": "select_faces", "params": {"target": "Cylinder", "faces_set_index": i % groups}}, None))
+    report("select_faces", elapsed, latencies, f"{len(mesh.polygons)} faces, {groups} rings")
+
+def setup_select_faces(args):
+    obj = bpy.data.objects.new("Cylinder", bisected_cylinder(args.segments, args.rings))
+    bpy.context.scene.collection.objects.link(obj)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated subset of " + ", ".join(WORKLOADS))
+    parser.add_argument("--clients", type=int, default=8, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per workload (fewer for heavy ones)")
+    parser.add_argument("--workers", type=int, default=8, help="HTTP worker threads")
+    parser.add_argument("--objects", type=int, default=1000, help="objects the flood workloads modify")
+    parser.add_argument("--scene-objects", type=int, default=20000, help="objects in the scene for the models workload")
+    parser.add_argument("--grid", type=int, default=200, help="vertices per side of polygon_shape grids")
+    parser.add_argument("--segments", type=int, default=256)
+    parser.add_argument("--rings", type=int, default=64)
+    parser.add_argument("--verbose", action="store_true", help="show the add-on's output")
+    args = parser.parse_args()
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    if not args.verbose:
+        # Records are written by the add-on's log thread, outside quiet()
+        os.environ.setdefault("BLEND_REST_LOG_LEVEL", "WARNING")
+    addon = load_addon()
+    populate(args.objects, "Flood")
+    populate(args.scene_objects, "Scene")
+    setup_select_faces(args)
+    addon.scene_snapshots.mark_all_dirty()
+    harness = Harness(addon, args.workers)
+    harness.start()
+
+    print(f"{'workload':<20} {'requests':>8} {'req/s':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+          file=RESULTS, flush=True)
+    benches = {
+        "flood": bench_flood,
+        "enqueue": bench_enqueue,
+        "polygon_json": lambda h, a: bench_polygon(h, a, binary=False),
+        "polygon_npz": lambda h, a: bench_polygon(h, a, binary=True),
+        "models": bench_models,
+        "select_faces": bench_select_faces,
+    }
+    try:
+        for workload in workloads:
+            with contextlib.nullcontext() if args.verbose else quiet():
+                benches[workload](harness, args)
+    finally:
+        with quiet():
+            harness.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Stand-in for the ``blender`` executable that runs ``--python`` scripts against this folder's ``bpy``.
+
+    blender.py -b [--factory-startup] [scene.blend] --python script.py -- [script arguments]
+
+Only what ``dispatcher.py`` passes to its workers is understood; a .blend file
+is ignored, since the stand-in scene always starts empty.
+"""
+import os
+import runpy
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--python" not in args:
+        sys.exit("blender.py: only -b ... --python script.py is supported")
+    script = args[args.index("--python") + 1]
+    # Blender leaves its own arguments in sys.argv; scripts read theirs after "--"
+    sys.argv = [script] + args
+    runpy.run_path(script, run_name="__main__")
@@ -0,0 +1,63 @@
+"""Stand-in for ``bmesh``: a BMesh read from a fake Mesh, with per-element Python objects."""
+from mathutils import Vector
+
+class _Sequence(list):
+    def ensure_lookup_table(self):
+        pass
+
+class BMVert:
+    def __init__(self, index, co):
+        self.index = index
+        self.co = Vector(co)
+        self.link_faces = []
+
+class BMEdge:
+    def __init__(self, index, verts):
+        self.index = index
+        self.verts = verts
+
+class BMFace:
+    def __init__(self, index, verts):
+        self.index = index
+        self.verts = verts
+        self.select = False
+
+    def calc_center_median(self):
+        center = Vector()
+        for vert in self.verts:
+            center = center + vert.co
+        return center * (1.0 / len(self.verts))
+
+class BMesh:
+    def __init__(self):
+        self.verts = _Sequence()
+        self.edges = _Sequence()
+        self.faces = _Sequence()
+
+    def from_mesh(self, mesh):
+        self.verts[:] = [BMVert(i, co) for i, co in enumerate(mesh.vertices._arrays["co"].tolist())]
+        self.edges[:] = [BMEdge(i, [self.verts[a], self.verts[b]])
+                         for i, (a, b) in enumerate(mesh.edges._arrays["vertices"].tolist())]
+        loop_verts = mesh.loops._arrays["vertex_index"].tolist()
+        polygons = mesh.polygons._arrays
+        for i, (start, size) in enumerate(zip(polygons["loop_start"].tolist(), polygons["loop_total"].tolist())):
+            face = BMFace(i, [self.verts[v] for v in loop_verts[start:start + size]])
+            for vert in face.verts:
+                vert.link_faces.append(face)
+            self.faces.append(face)
+
+    def free(self):
+        pass
+
+def new():
+    return BMesh()
+
+def from_edit_mesh(mesh):
+    """The edit-mode BMesh of a mesh; built once, since Blender keeps it while in edit mode"""
+    if getattr(mesh, "_edit_bmesh", None) is None:
+        mesh._edit_bmesh = BMesh()
+        mesh._edit_bmesh.from_mesh(mesh)
+    return mesh._edit_bmesh
+
+def update_edit_mesh(mesh, loop_triangles=True, destructive=True):
+    pass
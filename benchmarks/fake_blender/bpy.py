@@ -0,0 +1,283 @@
+"""Stand-in for the parts of ``bpy`` that Blend-REST and the benchmarks touch.
+
+Mesh element properties are kept as NumPy arrays so foreach_get/foreach_set
+behave like Blender's. Objects, collections, scenes, the context, operators,
+timers and handlers do just enough for ``__init__.py`` and the actions to run
+their own Python code; operators change no geometry. Nothing here models the
+cost of Blender itself.
+"""
+import contextlib
+import types as _types
+
+import numpy as np
+
+class _Collection:
+    """A mesh element collection storing each property as one NumPy array"""
+
+    def __init__(self, **arrays):
+        self._arrays = arrays
+
+    def __len__(self):
+        return len(next(iter(self._arrays.values())))
+
+    def add(self, count):
+        for attr, array in self._arrays.items():
+            self._arrays[attr] = np.concatenate([array, np.zeros((count,) + array.shape[1:], dtype=array.dtype)])
+
+    def foreach_get(self, attr, out):
+        out[...] = self._arrays[attr].reshape(out.shape)
+
+    def foreach_set(self, attr, values):
+        target = self._arrays[attr]
+        target[...] = np.asarray(values, dtype=target.dtype).reshape(target.shape)
+
+class Mesh:
+    def __init__(self, name, vertices=(), faces=()):
+        """Build from an (N, 3) coordinate array and a list of vertex index lists"""
+        self.name = name
+        self.users = 0
+        self.use_fake_user = False
+        self.vertices = _Collection(co=np.zeros((0, 3), dtype=np.float32), select=np.zeros(0, dtype=bool))
+        self.edges = _Collection(vertices=np.zeros((0, 2), dtype=np.int32), select=np.zeros(0, dtype=bool))
+        self.loops = _Collection(vertex_index=np.zeros(0, dtype=np.int32), edge_index=np.zeros(0, dtype=np.int32))
+        self.polygons = _Collection(loop_start=np.zeros(0, dtype=np.int32), loop_total=np.zeros(0, dtype=np.int32),
+                                    select=np.zeros(0, dtype=bool))
+        if len(vertices):
+            self.from_pydata(vertices, [], faces)
+
+    def from_pydata(self, vertices, edges, faces):
+        face_sizes = np.array([len(f) for f in faces], dtype=np.int32)
+        self.vertices.add(len(vertices))
+        self.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+        self.loops.add(int(face_sizes.sum()))
+        self.loops.foreach_set("vertex_index", [v for f in faces for v in f])
+        self.polygons.add(len(faces))
+        self.polygons.foreach_set("loop_start", np.concatenate([[0], np.cumsum(face_sizes)[:-1]]) if len(faces) else [])
+        self.update(calc_edges=True)
+
+    def update(self, calc_edges=False):
+        """Derive loop totals (as Blender 4 does) and, with ``calc_edges``, the edges"""
+        loops = len(self.loops)
+        starts = self.polygons._arrays["loop_start"]
+        self.polygons._arrays["loop_total"] = np.diff(np.append(starts, loops)).astype(np.int32)
+        if calc_edges:
+            self._calc_edges()
+        self._edit_bmesh = None
+
+    def _calc_edges(self):
+        # Edges in order of first use, as Mesh.update(calc_edges=True) leaves them
+        sizes = self.polygons._arrays["loop_total"]
+        starts = self.polygons._arrays["loop_start"]
+        loop_verts = self.loops._arrays["vertex_index"]
+        face_of_loop = np.repeat(np.arange(len(sizes)), sizes)
+        local = np.arange(len(loop_verts)) - starts[face_of_loop]
+        following = loop_verts[starts[face_of_loop] + (local + 1) % sizes[face_of_loop]]
+        pairs = np.sort(np.stack([loop_verts, following], axis=1), axis=1)
+        keys = pairs[:, 0].astype(np.int64) * max(len(self.vertices), 1) + pairs[:, 1]
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        self.edges._arrays = {"vertices": pairs[first[order]].astype(np.int32), "select": np.zeros(len(order), dtype=bool)}
+        self.loops._arrays["edge_index"] = rank[inverse.ravel()].astype(np.int32)
+
+    def as_pointer(self):
+        return id(self)
+
+class Object:
+    def __init__(self, name, object_data=None):
+        self.name = name
+        self.data = object_data
+        self.type = 'MESH' if isinstance(object_data, Mesh) else 'EMPTY'
+        self.mode = 'OBJECT'
+        self.location = [0.0, 0.0, 0.0]
+        self.rotation_euler = [0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+        self.dimensions = [2.0, 2.0, 2.0]
+        self._selected = False
+
+    def select_get(self):
+        return self._selected
+
+    def select_set(self, state):
+        self._selected = bool(state)
+
+    def visible_get(self):
+        return True
+
+    def update_from_editmode(self):
+        return True
+
+    def update_tag(self, refresh=set()):
+        pass
+
+    @property
+    def users_scene(self):
+        return [scene for scene in data.scenes if scene.collection.objects.get(self.name) is self]
+
+class _IDCollection:
+    """Datablocks by name with Blender's ``.001`` renaming and foreach access"""
+
+    def __init__(self, factory=None):
+        self._factory = factory
+        self._items = {}
+
+    def new(self, name, *args):
+        unique, number = name, 0
+        while unique in self._items:
+            number += 1
+            unique = f"{name}.{number:03d}"
+        item = self._factory(unique, *args)
+        self._items[unique] = item
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self._items.pop(item.name, None)
+        if do_unlink and isinstance(item, Object):
+            for scene in data.scenes:
+                scene.collection.objects.unlink(item)
+
+    def link(self, item):
+        self._items[item.name] = item
+
+    def unlink(self, item):
+        self._items.pop(item.name, None)
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def keys(self):
+        return self._items.keys()
+
+    def values(self):
+        return list(self._items.values())
+
+    def items(self):
+        return self._items.items()
+
+    def __getitem__(self, key):
+        return list(self._items.values())[key] if isinstance(key, int) else self._items[key]
+
+    def __contains__(self, item):
+        return (item if isinstance(item, str) else item.name) in self._items
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def foreach_get(self, attr, out):
+        out[...] = np.array([getattr(item, attr) for item in self._items.values()], dtype=out.dtype).reshape(out.shape)
+
+    def foreach_set(self, attr, values):
+        values = np.asarray(values).reshape(len(self._items), -1).tolist()
+        for item, value in zip(self._items.values(), values):
+            setattr(item, attr, value)
+
+class Collection:
+    def __init__(self, name):
+        self.name = name
+        self.objects = _IDCollection()
+        self.children = _IDCollection()
+
+class ViewLayer:
+    def __init__(self, name="ViewLayer"):
+        self.name = name
+        self.objects = _types.SimpleNamespace(active=None)
+
+    def update(self):
+        pass
+
+class Scene:
+    def __init__(self, name):
+        self.name = name
+        self.collection = Collection("Scene Collection")
+        self.view_layers = [ViewLayer()]
+        self.unit_settings = _types.SimpleNamespace(system='NONE', scale_length=1.0, length_unit='METERS')
+        self.camera = None
+        self.cursor = _types.SimpleNamespace(location=(0.0, 0.0, 0.0))
+
+    @property
+    def objects(self):
+        return self.collection.objects
+
+class _Data:
+    def __init__(self):
+        self.objects = _IDCollection(Object)
+        self.meshes = _IDCollection(Mesh)
+        self.collections = _IDCollection(Collection)
+        self.scenes = _IDCollection(Scene)
+
+data = _Data()
+
+class _Context:
+    def __init__(self):
+        self.scene = data.scenes.new("Scene")
+        self.view_layer = self.scene.view_layers[0]
+        self.collection = self.scene.collection
+        self.window = None
+        self.window_manager = _types.SimpleNamespace(windows=[])
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    object = active_object
+
+    @property
+    def mode(self):
+        active = self.active_object
+        return 'EDIT_MESH' if active is not None and active.mode == 'EDIT' else 'OBJECT'
+
+    @contextlib.contextmanager
+    def temp_override(self, **overrides):
+        previous = {key: getattr(self, key) for key in overrides}
+        for key, value in overrides.items():
+            setattr(self, key, value)
+        try:
+            yield
+        finally:
+            for key, value in previous.items():
+                setattr(self, key, value)
+
+context = _Context()
+
+def _select_all(action='TOGGLE'):
+    for obj in context.scene.objects:
+        obj.select_set(action == 'SELECT')
+    return {'FINISHED'}
+
+def _mode_set(mode='OBJECT'):
+    if context.active_object is not None:
+        context.active_object.mode = mode
+    return {'FINISHED'}
+
+ops = _types.SimpleNamespace(
+    ed=_types.SimpleNamespace(undo_push=lambda message="": {'FINISHED'},
+                              undo=lambda: {'FINISHED'}, redo=lambda: {'FINISHED'}),
+    object=_types.SimpleNamespace(select_all=_select_all, mode_set=_mode_set),
+)
+
+class _Timers:
+    def __init__(self):
+        self._functions = set()
+
+    def register(self, function, first_interval=0, persistent=False):
+        self._functions.add(function)
+
+    def unregister(self, function):
+        self._functions.discard(function)
+
+    def is_registered(self, function):
+        return function in self._functions
+
+app = _types.SimpleNamespace(
+    version=(4, 2, 0),
+    background=True,
+    timers=_Timers(),
+    handlers=_types.SimpleNamespace(depsgraph_update_post=[], load_post=[], persistent=lambda function: function),
+)
+
+types = _types.SimpleNamespace(Operator=object, Panel=object, Object=Object, Mesh=Mesh, Scene=Scene)
+utils = _types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
@@ -0,0 +1,39 @@
+"""Stand-in for Blender's ``mathutils`` with single-precision vectors, like the real one."""
+from array import array
+
+class Vector:
+    __slots__ = ("_co",)
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._co = array("f", values)
+
+    def __getitem__(self, i):
+        return self._co[i]
+
+    def __setitem__(self, i, value):
+        self._co[i] = value
+
+    def __len__(self):
+        return len(self._co)
+
+    def __iter__(self):
+        return iter(self._co)
+
+    def __add__(self, other):
+        return Vector([a + b for a, b in zip(self._co, other)])
+
+    def __sub__(self, other):
+        return Vector([a - b for a, b in zip(self._co, other)])
+
+    def __mul__(self, scalar):
+        return Vector([a * scalar for a in self._co])
+
+    def __truediv__(self, scalar):
+        return self * (1.0 / scalar)
+
+    def __repr__(self):
+        return f"Vector({tuple(self._co)})"
+
+    x = property(lambda self: self._co[0], lambda self, v: self.__setitem__(0, v))
+    y = property(lambda self: self._co[1], lambda self, v: self.__setitem__(1, v))
+    z = property(lambda self: self._co[2], lambda self, v: self.__setitem__(2, v))
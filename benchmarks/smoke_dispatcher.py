@@ -0,0 +1,141 @@
+"""Run ``dispatcher.py`` end to end against stand-in Blender workers.
+
+Starts the dispatcher with ``fake_blender/blender.py`` as the Blender
+executable, so every worker is ``headless.py`` on the stand-ins in
+``fake_blender``, then checks the routes the dispatcher handles itself:
+
+    python benchmarks/smoke_dispatcher.py [--workers 2] [--verbose]
+
+Session affinity, worker-prefixed job ids, the merged ``GET /v1/jobs``
+cursor, ``GET /v1/sessions``, ``DELETE /v1/sessions/<id>``, the
+``GET /v1/events`` session requirement and the combined status and metrics
+are exercised. Exits non-zero on the first failed check.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FAKE_BLENDER = os.path.join(HERE, "fake_blender", "blender.py")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def request(conn, method, path, body=None, session=None):
+    headers = {"Content-Type": "application/json"}
+    if session is not None:
+        headers["X-Session-Id"] = session
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.getheader("Content-Type", "").startswith("application/json"):
+        data = json.loads(data)
+    return response.status, data, response.getheader("X-Blend-Worker")
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+    print(f"ok  {message}")
+
+def wait_ready(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            status, data, _ = request(conn, "GET", "/v1/status")
+            conn.close()
+            if status == 200 and data["status"] == "ready":
+                return data
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Dispatcher did not become ready within {timeout:.0f} s")
+
+def run_checks(port, workers):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    command = {"action": "setup_scene", "params": {}}
+
+    # One session per worker: the least busy worker takes each new session
+    served = {}
+    for i in range(workers):
+        status, data, worker = request(conn, "POST", "/v1/commands?wait=true", command, session=f"s{i}")
+        check(status == 200 and data["status"] == "done", f"session s{i} command runs on worker {worker}")
+        check(data["job_id"] == f"{worker}-1", f"job id {data['job_id']} carries its worker")
+        served[f"s{i}"] = worker
+    check(len(set(served.values())) == workers, "sessions are spread over all workers")
+    status, data, worker = request(conn, "POST", "/v1/commands?wait=true", command, session="s0")
+    check(worker == served["s0"] and data["job_id"] == f"{worker}-2", "a session sticks to its worker")
+
+    status, data, worker = request(conn, "GET", f"/v1/jobs/{data['job_id']}")
+    check(status == 200 and worker == served["s0"], "GET /v1/jobs/<worker>-<id> is routed back")
+
+    status, data, _ = request(conn, "GET", "/v1/jobs?limit=2")
+    check(status == 200 and len(data["jobs"]) == 2, "GET /v1/jobs merges workers up to limit")
+    status, rest, _ = request(conn, "GET", f"/v1/jobs?since={data['last_id']}")
+    ids = [job["job_id"] for job in data["jobs"] + rest["jobs"]]
+    check(len(ids) == workers + 1 and len(set(ids)) == len(ids), f"the since cursor {data['last_id']} pages without repeats")
+    status, data, _ = request(conn, "GET", "/v1/jobs?since=x")
+    check(status == 400, "a malformed jobs cursor answers 400")
+
+    status, data, _ = request(conn, "GET", "/v1/sessions")
+    listed = {entry["session"]: str(entry["worker"]) for entry in data["sessions"]}
+    check(listed == served, "GET /v1/sessions lists every worker's sessions")
+
+    status, data, _ = request(conn, "GET", "/v1/events?timeout=0")
+    check(status == 400, "GET /v1/events without a session answers 400")
+    status, data, worker = request(conn, "GET", "/v1/events?timeout=0", session="s0")
+    check(status == 200 and worker == served["s0"], "GET /v1/events follows the session's worker")
+
+    status, data, worker = request(conn, "DELETE", "/v1/sessions/s0")
+    check(status == 200 and worker == served["s0"], "DELETE /v1/sessions/<id> goes to the session's worker")
+    status, data, _ = request(conn, "DELETE", "/v1/sessions/s0")
+    check(status == 404, "a deleted session is forgotten")
+
+    status, data, _ = request(conn, "GET", "/v1/status")
+    check(status == 200 and len(data["workers"]) == workers, "GET /v1/status lists every worker")
+    status, data, _ = request(conn, "GET", "/v1/metrics")
+    check(status == 200 and all(f'worker="{i}"' in data.decode() for i in range(workers)),
+          "GET /v1/metrics labels every worker's samples")
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="show the dispatcher's and workers' output")
+    args = parser.parse_args()
+
+    port, worker_port = free_port(), free_port()
+    env = dict(os.environ, BLEND_REST_LOG_LEVEL=os.environ.get("BLEND_REST_LOG_LEVEL", "WARNING"))
+    output = None if args.verbose else subprocess.DEVNULL
+    dispatcher = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "dispatcher.py"), "--blender", FAKE_BLENDER,
+         "--workers", str(args.workers), "--port", str(port), "--worker-port", str(worker_port),
+         "--startup-timeout", str(args.startup_timeout)],
+        env=env, stdout=output, stderr=output)
+    try:
+        wait_ready(port, args.startup_timeout + 10)
+        run_checks(port, args.workers)
+    except (AssertionError, RuntimeError) as e:
+        print(f"FAIL {e}")
+        sys.exit(1)
+    finally:
+        # The dispatcher stops its workers on SIGTERM
+        dispatcher.send_signal(signal.SIGTERM)
+        try:
+            dispatcher.wait(15)
+        except subprocess.TimeoutExpired:
+            dispatcher.kill()
+    print("dispatcher smoke test passed")
+
+if __name__ == "__main__":
+    main()
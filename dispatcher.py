@@ -0,0 +1,435 @@
+"""Spread Blend-REST work over several background Blender processes behind one endpoint.
+
+    python dispatcher.py --blender /path/to/blender --workers 4 [--port 8000] [--blend-file scene.blend] [--factory-startup]
+
+Each worker is ``blender -b --python headless.py`` on its own port. Requests
+carrying an ``X-Session-Id`` header always go to the same worker, chosen as
+the least busy one when the session is first seen, so a client's commands keep
+operating on one scene. Requests without a session go to the least busy worker
+and should be self-contained (a batch, or a command that creates what it uses).
+
+Workers load the user's preferences and so the add-ons enabled there:
+``add_thread`` needs MACHIN3tools and ``export`` to GLB the glTF exporter.
+``--factory-startup`` skips the preferences for reproducible workers, at the
+cost of those actions.
+
+Job ids from workers are returned as ``<worker>-<id>`` so ``GET /v1/jobs/<id>``
+can be routed back; ``GET /v1/status``, ``GET /v1/metrics``, ``GET /v1/sessions``
+and ``GET /v1/jobs`` combine all workers, and ``GET /v1/events`` and
+``DELETE /v1/sessions/<id>`` go to the worker of the session. This script runs
+under a plain Python interpreter and does not need ``bpy``.
+"""
+import argparse
+import heapq
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+SESSION_HEADER = "X-Session-Id"
+
+# Hop-by-hop headers are not forwarded between the client and a worker
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade",
+               "proxy-authorization", "proxy-authenticate", "host"}
+
+class Worker:
+    """One background Blender process serving Blend-REST on ``port``"""
+
+    def __init__(self, index, port, command):
+        self.index = index
+        self.port = port
+        self.command = command
+        self.process = None
+        self.active = 0  # requests currently forwarded to this worker
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.process = subprocess.Popen(self.command)
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def track(self, delta):
+        with self._lock:
+            self.active += delta
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout)
+        conn.request(method, path, body=body, headers=headers or {})
+        return conn, conn.getresponse()
+
+    def wait_ready(self, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.alive:
+                raise RuntimeError(f"Worker {self.index} exited with code {self.process.returncode}")
+            try:
+                conn, response = self.request("GET", "/v1/status", timeout=1.0)
+                response.read()
+                conn.close()
+                if response.status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"Worker {self.index} did not start within {timeout:.0f} s")
+
+    def stop(self, timeout=10.0):
+        if self.alive:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class Dispatcher:
+    """Routes requests to workers and keeps session affinity"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def route(self, session=None):
+        """Pick the worker for a request; None when no worker is alive"""
+        with self._lock:
+            if session is not None and session in self.sessions:
+                worker = self.sessions[session]
+                return worker if worker.alive else None
+            alive = [w for w in self.workers if w.alive]
+            if not alive:
+                return None
+            worker = min(alive, key=lambda w: (w.active, w.sessions, w.index))
+            if session is not None:
+                self.sessions[session] = worker
+                worker.sessions += 1
+            return worker
+
+    def session_worker(self, session):
+        """The worker a session was routed to, or None if it has not been seen"""
+        with self._lock:
+            return self.sessions.get(session)
+
+    def forget(self, session):
+        """Drop a deleted session so its next request picks the least busy worker again"""
+        with self._lock:
+            worker = self.sessions.pop(session, None)
+            if worker is not None:
+                worker.sessions -= 1
+
+    def worker_for_job(self, job_id):
+        """Split a ``<worker>-<id>`` job id into its worker and the worker's own id"""
+        index, _, local_id = job_id.partition("-")
+        if not (index.isdigit() and local_id.isdigit() and int(index) < len(self.workers)):
+            return None, None
+        return self.workers[int(index)], local_id
+
+    def status(self):
+        workers = []
+        for worker in self.workers:
+            entry = {"index": worker.index, "port": worker.port, "alive": worker.alive,
+                     "pid": worker.process.pid if worker.process else None,
+                     "active_requests": worker.active, "sessions": worker.sessions}
+            if worker.alive:
+                try:
+                    entry.update(get_json(worker, "/v1/status"))
+                except (OSError, ValueError) as e:
+                    entry["error"] = str(e)
+            workers.append(entry)
+        ready = sum(1 for w in workers if w.get("status") == "ready")
+        return {
+            "status": "ready" if ready == len(workers) else "degraded" if ready else "down",
+            "workers": workers,
+            "objects": sum(w.get("objects", 0) for w in workers),
+            "queue_depth": sum(w.get("scheduler", {}).get("queue_depth", 0) for w in workers),
+        }
+
+    def list_sessions(self):
+        """Sessions of every live worker, each with the index of its worker"""
+        sessions = []
+        for worker in self.workers:
+            if worker.alive:
+                sessions += [dict(session, worker=worker.index)
+                             for session in get_json(worker, "/v1/sessions")["sessions"]]
+        return {"sessions": sessions}
+
+    def list_jobs(self, since, limit):
+        """Jobs of every live worker after the ``since`` cursor, oldest first.
+
+        Workers number their jobs independently, so the cursor holds one last
+        id per worker (``"0-12,1-7"``); a plain number applies to all of them.
+        Returns the jobs and the cursor to pass as the next ``since``.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be a positive integer, got {limit}")
+        cursor = parse_cursor(since, len(self.workers))
+        listed = []
+        for worker in self.workers:
+            if worker.alive:
+                jobs = get_json(worker, f"/v1/jobs?since={cursor[worker.index]}&limit={limit}")["jobs"]
+                listed.append([(job["queued_at"], worker.index, job) for job in jobs])
+        jobs = []
+        # Each worker's list is already in order, so merging them keeps every worker's jobs in sequence
+        for _, index, job in heapq.merge(*listed, key=lambda entry: entry[0]):
+            if len(jobs) == limit:
+                break
+            cursor[index] = job["job_id"]
+            jobs.append(prefix_job_ids(job, index))
+        return jobs, ",".join(f"{index}-{last_id}" for index, last_id in enumerate(cursor))
+
+    def metrics(self):
+        """Prometheus text of every live worker, each sample labelled with its worker"""
+        families = {}  # metric name -> (header lines, samples), in first-seen order
+        for worker in self.workers:
+            if not worker.alive:
+                continue
+            try:
+                conn, response = worker.request("GET", "/v1/metrics", timeout=2.0)
+                text = response.read().decode()
+                conn.close()
+            except OSError:
+                continue
+            current = None
+            for line in text.splitlines():
+                if line.startswith("# HELP "):
+                    current = line.split()[2]
+                    if current not in families:
+                        families[current] = ([line], [])
+                elif line.startswith("# TYPE "):
+                    if len(families[current][0]) < 2:
+                        families[current][0].append(line)
+                elif line and current is not None:
+                    families[current][1].append(label_worker(line, worker.index))
+        lines = [line for headers, samples in families.values() for line in headers + samples]
+        return "\n".join(lines) + "\n"
+
+def get_json(worker, path):
+    """GET ``path`` from a worker and decode the JSON response"""
+    conn, response = worker.request("GET", path, timeout=2.0)
+    try:
+        return json.loads(response.read())
+    finally:
+        conn.close()
+
+def parse_cursor(since, workers):
+    """Last job id per worker from a ``GET /v1/jobs?since=`` value; raises ValueError if malformed"""
+    if since.isdigit():
+        return [int(since)] * workers
+    cursor = [0] * workers
+    for part in since.split(","):
+        index, _, last_id = part.partition("-")
+        if not (index.isdigit() and last_id.isdigit() and int(index) < workers):
+            raise ValueError(f"since must be a job id or a cursor like '0-12,1-7', got '{since}'")
+        cursor[int(index)] = int(last_id)
+    return cursor
+
+def label_worker(sample, index):
+    """Add a ``worker`` label to one Prometheus sample line"""
+    name, sep, rest = sample.partition("{")
+    if sep:
+        return f'{name}{{worker="{index}",{rest}'
+    name, _, value = sample.partition(" ")
+    return f'{name}{{worker="{index}"}} {value}'
+
+def prefix_job_ids(data, index):
+    """Rewrite worker job ids in a JSON response as ``<worker>-<id>``"""
+    if isinstance(data, dict):
+        if isinstance(data.get("job_id"), int):
+            local_id = data["job_id"]
+            data["job_id"] = f"{index}-{local_id}"
+            if isinstance(data.get("profile"), dict) and "url" in data["profile"]:
+                data["profile"]["url"] = f"/v1/jobs/{index}-{local_id}/profile"
+        for job in data.get("jobs", []) if isinstance(data.get("jobs"), list) else []:
+            prefix_job_ids(job, index)
+    return data
+
+def create_handler(dispatcher):
+    class DispatchHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Small responses would otherwise wait for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self._dispatch()
+
+        def do_POST(self):
+            self._dispatch()
+
+        def do_DELETE(self):
+            self._dispatch()
+
+        def _dispatch(self):
+            try:
+                path = urlsplit(self.path).path
+                if path == "/v1/status" and self.command == "GET":
+                    self._send_json(dispatcher.status())
+                    return
+                if path == "/v1/metrics" and self.command == "GET":
+                    body = dispatcher.metrics().encode()
+                    self.send_response(200)
+                    self.send_header("Content-type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if path == "/v1/sessions" and self.command == "GET":
+                    self._send_json(dispatcher.list_sessions())
+                    return
+                if path == "/v1/jobs" and self.command == "GET":
+                    query = parse_qs(urlsplit(self.path).query)
+                    try:
+                        limit = int(query.get("limit", [100])[0])
+                        jobs, last_id = dispatcher.list_jobs(query.get("since", ["0"])[0], limit)
+                    except ValueError as e:
+                        self._send_json({"error": str(e)}, 400)
+                        return
+                    self._send_json({"jobs": jobs, "last_id": last_id})
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if path.startswith("/v1/sessions/") and self.command == "DELETE":
+                    session = unquote(path[len("/v1/sessions/"):])
+                    worker = dispatcher.session_worker(session)
+                    if worker is None:
+                        self._send_json({"error": f"Session '{session}' not found"}, 404)
+                        return
+                    if self._forward(worker, self.path, body) == 200:
+                        dispatcher.forget(session)
+                    return
+                if path == "/v1/events" and self.headers.get(SESSION_HEADER) is None:
+                    # Every worker numbers its own events; a stream of one arbitrary worker would miss the rest
+                    self._send_json({"error": f"Send an {SESSION_HEADER} header to follow the events "
+                                              "of the worker serving that session"}, 400)
+                    return
+                if path.startswith("/v1/jobs/"):
+                    job_id, slash, rest = path[len("/v1/jobs/"):].partition("/")
+                    worker, local_id = dispatcher.worker_for_job(job_id)
+                    if worker is None:
+                        self._send_json({"error": "Job ids look like <worker>-<id>"}, 404)
+                        return
+                    self._forward(worker, f"/v1/jobs/{local_id}{slash}{rest}", body)
+                    return
+                worker = dispatcher.route(self.headers.get(SESSION_HEADER))
+                if worker is None:
+                    self._send_json({"error": "No worker available for this request"}, 503)
+                    return
+                self._forward(worker, self.path, body)
+            except Exception as e:
+                self.close_connection = True
+                self._send_json({"error": str(e)}, 502)
+
+        def _forward(self, worker, path, body):
+            """Relay the request to ``worker`` and its response to the client; returns the response status"""
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_HEADERS}
+            worker.track(1)
+            try:
+                conn, response = worker.request(self.command, path, body or None, headers)
+                try:
+                    content_type = response.getheader("Content-Type", "")
+                    if content_type.startswith("application/json"):
+                        data = response.read()
+                        if path.startswith(("/v1/commands", "/v1/jobs")):
+                            data = json.dumps(prefix_job_ids(json.loads(data), worker.index)).encode()
+                        self._send_body(response, data, worker)
+                    else:
+                        self._stream(response, worker)
+                    return response.status
+                finally:
+                    conn.close()
+            finally:
+                worker.track(-1)
+
+        def _send_headers(self, response, worker, skip=()):
+            self.send_response(response.status)
+            for key, value in response.getheaders():
+                if key.lower() not in HOP_HEADERS and key.lower() not in skip:
+                    self.send_header(key, value)
+            self.send_header("X-Blend-Worker", str(worker.index))
+
+        def _send_body(self, response, data, worker):
+            self._send_headers(response, worker, skip=("content-length",))
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, response, worker):
+            """Relay a binary or event-stream response as it arrives"""
+            self._send_headers(response, worker)
+            if response.getheader("Content-Length") is None:
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            self.end_headers()
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                self.wfile.flush()
+
+        def _send_json(self, data, code=200):
+            body = json.dumps(data, default=str).encode()
+            self.send_response(code)
+            self.send_header("Content-type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DispatchHandler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run several headless Blend-REST workers behind one endpoint")
+    parser.add_argument("--blender", default="blender", help="Blender executable")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of Blender processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--worker-port", type=int, default=8100, help="port of the first worker")
+    parser.add_argument("--blend-file", help="scene every worker opens on start")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--factory-startup", action="store_true",
+                        help="start workers without user preferences or the add-ons they enable")
+    args = parser.parse_args(argv)
+
+    headless = os.path.join(os.path.dirname(os.path.abspath(__file__)), "headless.py")
+    workers = []
+    for index in range(args.workers):
+        port = args.worker_port + index
+        command = [args.blender, "-b"] + (["--factory-startup"] if args.factory_startup else [])
+        command += [args.blend_file] if args.blend_file else []
+        command += ["--python", headless, "--", "--host", "127.0.0.1", "--port", str(port)]
+        workers.append(Worker(index, port, command))
+
+    server = None
+    # Exit through the finally clause below so workers are not left running
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.wait_ready(args.startup_timeout)
+        server = ThreadingHTTPServer((args.host, args.port), create_handler(Dispatcher(workers)))
+        print(f"[Blend-REST] Dispatching {args.host}:{args.port} to {len(workers)} workers "
+              f"on ports {args.worker_port}-{args.worker_port + len(workers) - 1}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"[Blend-REST] {e}")
+        sys.exit(1)
+    finally:
+        if server:
+            server.server_close()
+        for worker in workers:
+            worker.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+class EventLog:
+    """Bounded, sequence-numbered log of scene and job events.
+
+    The main thread publishes; HTTP threads read with ``since`` and may block
+    until newer events arrive (long-poll and Server-Sent Events). Only the last
+    ``capacity`` events are kept, so a reader that falls further behind is told
+    its view is truncated and should resynchronize from /v1/models.
+    """
+
+    def __init__(self, capacity=10000):
+        self._events = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, type, **data):
+        self.publish_many([(type, data)])
+
+    def publish_many(self, events):
+        """Append ``(type, data)`` pairs under one lock and wake waiting readers once"""
+        if not events:
+            return
+        now = time.time()
+        with self._cond:
+            for type, data in events:
+                self._seq += 1
+                self._events.append({"seq": self._seq, "type": type, "time": now, **data})
+            self._cond.notify_all()
+
+    def since(self, seq, timeout=0.0, limit=1000):
+        """Return ``(events, last_seq, truncated)`` for events newer than ``seq``.
+
+        Blocks for up to ``timeout`` seconds while there is nothing newer.
+        """
+        with self._cond:
+            if timeout > 0 and self._seq <= seq:
+                self._cond.wait_for(lambda: self._seq > seq, timeout)
+            if not self._events or self._seq <= seq:
+                return [], self._seq, False
+            first = self._events[0]["seq"]
+            truncated = seq + 1 < first
+            start = max(0, seq + 1 - first)
+            events = list(itertools.islice(self._events, start, start + limit))
+        return events, events[-1]["seq"], truncated
@@ -0,0 +1,66 @@
+"""Run Blend-REST in a background Blender process.
+
+    blender -b [scene.blend] --python headless.py -- [--host 127.0.0.1] [--port 8000] [--workers 8] [--output-dir DIR] [--profile-rate 0.01] [--log-level DEBUG]
+
+Timers do not fire while a ``--python`` script runs in background mode, so this
+registers the addon, starts the server and then drives ``process_commands``
+itself until the process is interrupted or terminated.
+"""
+import argparse
+import importlib.util
+import os
+import signal
+import sys
+import time
+
+def load_addon():
+    """Import this folder as the addon package, whatever it is named on disk"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    spec = importlib.util.spec_from_file_location(
+        "blend_rest", os.path.join(package_dir, "__init__.py"), submodule_search_locations=[package_dir])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+def parse_args(argv):
+    # Blender hands the arguments after "--" to the script
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(prog="headless.py", description="Serve Blend-REST from background Blender")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="HTTP worker threads")
+    parser.add_argument("--output-dir", help="directory the export action writes to")
+    parser.add_argument("--profile-rate", type=float, help="fraction of commands to profile without being asked")
+    parser.add_argument("--log-level", choices=("DEBUG", "INFO", "WARNING", "ERROR"), type=str.upper,
+                        help="least severe messages to log (default INFO)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv if argv is None else argv)
+    if args.output_dir:
+        os.environ["BLEND_REST_EXPORT_DIR"] = args.output_dir
+    if args.profile_rate is not None:
+        os.environ["BLEND_REST_PROFILE_RATE"] = str(args.profile_rate)
+    if args.log_level:
+        os.environ["BLEND_REST_LOG_LEVEL"] = args.log_level
+    addon = load_addon()
+    addon.register()
+    addon.rest_server = addon.BlendRESTServer()
+    result = addon.rest_server.start_server(port=args.port, host=args.host, workers=args.workers)
+    if result["status"] != "started":
+        print(f"[Blend-REST] Could not start server: {result.get('error', result['status'])}")
+        sys.exit(1)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    try:
+        while not stopping:
+            time.sleep(addon.process_commands())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        addon.unregister()
+
+if __name__ == "__main__":
+    main()
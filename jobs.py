@@ -0,0 +1,139 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Job ids increase monotonically so clients can page with ?since=<id>
+_job_ids = itertools.count(1)
+
+class Job:
+    """A queued command together with the future process_commands resolves.
+
+    ``func`` replaces the action lookup for internal main-thread calls, and
+    untracked jobs stay out of the job store and the event feed. Jobs with a
+    ``session`` run in that session's scene. Profiled jobs carry a summary in
+    ``profile``.
+    """
+
+    def __init__(self, command, func=None, tracked=True, session=None):
+        self.id = next(_job_ids)
+        self.command = command
+        self.func = func
+        self.tracked = tracked
+        self.session = session
+        self.action = command.get("action")
+        self.future = Future()
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.profile = None
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+
+    def finish(self, result, finished_at=None):
+        self.result = result
+        self.status = "done"
+        self.finished_at = finished_at or time.time()
+        # Drop the payload so retained jobs only hold their (small) results
+        self.command = None
+        self.future.set_result(result)
+
+    def fail(self, error, finished_at=None):
+        self.error = str(error)
+        self.status = "failed"
+        self.finished_at = finished_at or time.time()
+        self.command = None
+        self.future.set_exception(error)
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def execution_time(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def wait(self, timeout):
+        """Block until the main thread finished the job or the timeout elapsed"""
+        try:
+            self.future.result(timeout=timeout)
+        except Exception:
+            # Timeouts and action errors are both reported through the job status
+            pass
+        return self
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "action": self.action,
+            "status": self.status,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.session is not None:
+            data["session"] = self.session
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "failed":
+            data["error"] = self.error
+        if self.finished:
+            data["execution_time"] = self.execution_time
+        if self.profile is not None and self.finished:
+            data["profile"] = self.profile
+        return data
+
+class JobStore:
+    """Bounded, thread-safe record of recent jobs.
+
+    Finished jobs expire ``ttl`` seconds after completion, and once more than
+    ``max_jobs`` are held the least recently accessed finished jobs are evicted.
+    Queued and running jobs are never evicted.
+    """
+
+    def __init__(self, max_jobs=1000, ttl=3600.0):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()  # job id -> Job, least recently used first
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+            return job
+
+    def since(self, job_id=0, limit=100):
+        """Return up to ``limit`` retained jobs with an id greater than ``job_id``, oldest first"""
+        with self._lock:
+            self._evict()
+            jobs = sorted((j for j in self._jobs.values() if j.id > job_id), key=lambda j: j.id)
+        return jobs[:limit]
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _evict(self):
+        expired_before = time.time() - self.ttl
+        for job_id in [i for i, j in self._jobs.items() if j.finished and j.finished_at < expired_before]:
+            del self._jobs[job_id]
+        if len(self._jobs) <= self.max_jobs:
+            return
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [i for i, j in self._jobs.items() if j.finished][:excess]:
+            del self._jobs[job_id]
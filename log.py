@@ -0,0 +1,158 @@
+import logging
+import logging.handlers
+import os
+import queue
+import reprlib
+import sys
+import threading
+import time
+
+# Parent of every Blend-REST logger; actions log to "blend_rest.<action>"
+LOGGER_NAME = "blend_rest"
+
+# Defaults, overridden by BLEND_REST_LOG_LEVEL, BLEND_REST_LOG_ASYNC and BLEND_REST_LOG_MAX_CHARS
+DEFAULT_LEVEL = "INFO"
+DEFAULT_MAX_CHARS = 1000
+
+# Each message template may be logged this many times per period; the rest are counted and dropped
+RATE_LIMIT_BURST = 20
+RATE_LIMIT_PERIOD = 10.0
+
+FORMAT = "[Blend-REST] %(levelname)s %(component)s: %(message)s"
+
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlevel = 3
+_payload_repr.maxdict = 8
+_payload_repr.maxlist = 6
+_payload_repr.maxtuple = 6
+_payload_repr.maxstring = 80
+_payload_repr.maxother = 80
+
+class Truncated:
+    """Log argument that renders a bounded repr of a payload, and only if the record is emitted.
+
+    ``logger.debug("Received %s", Truncated(command))`` costs nothing with debug
+    logging off, and never stringifies a large vertex list in full when it is on.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return _payload_repr.repr(self.value)
+
+class RateLimitFilter(logging.Filter):
+    """Let each message template through ``burst`` times per ``period`` seconds.
+
+    Dropped records are counted and the count is reported on the next record
+    of that template that gets through.
+    """
+
+    def __init__(self, burst=RATE_LIMIT_BURST, period=RATE_LIMIT_PERIOD, max_keys=1024):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_keys = max_keys
+        self._windows = {}  # (logger, template) -> [window start, records, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                if len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                window = self._windows[key] = [now, 0, 0]
+            elif now - window[0] >= self.period:
+                window[0], window[1] = now, 0
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+            record.suppressed, window[2] = window[2], 0
+        return True
+
+class TruncatingFormatter(logging.Formatter):
+    """Formatter that shortens long messages and notes suppressed repeats"""
+
+    def __init__(self, fmt=FORMAT, max_chars=DEFAULT_MAX_CHARS):
+        super().__init__(fmt)
+        self.max_chars = max_chars
+
+    def format(self, record):
+        record.component = record.name[len(LOGGER_NAME) + 1:] or "server" if record.name.startswith(LOGGER_NAME) else record.name
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... ({len(message) - self.max_chars} more characters)"
+        if getattr(record, "suppressed", 0):
+            message += f" ({record.suppressed} similar messages suppressed)"
+        # Format a copy so the shortened text does not leak into other handlers
+        record = logging.makeLogRecord(dict(record.__dict__, msg=message, args=None, exc_info=record.exc_info))
+        return super().format(record)
+
+def get_logger(name=None):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+def configure(level=None, async_output=None, max_chars=None, stream=None):
+    """Set up the Blend-REST loggers; safe to call again (e.g. when the addon is reloaded).
+
+    With ``async_output`` records are handed to a queue and written by a
+    background thread, so Blender's main thread never waits for the console.
+    """
+    level = level or os.environ.get("BLEND_REST_LOG_LEVEL") or DEFAULT_LEVEL
+    if async_output is None:
+        async_output = os.environ.get("BLEND_REST_LOG_ASYNC", "1").lower() not in ("0", "false", "no")
+    if max_chars is None:
+        max_chars = int(os.environ.get("BLEND_REST_LOG_MAX_CHARS") or DEFAULT_MAX_CHARS)
+
+    shutdown()
+    logger = get_logger()
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+
+    output = logging.StreamHandler(stream) if stream else _ConsoleHandler()
+    output.setFormatter(TruncatingFormatter(max_chars=max_chars))
+    if async_output:
+        handler = _QueueHandler(queue.SimpleQueue())
+        handler.listener = logging.handlers.QueueListener(handler.queue, output)
+        handler.listener.start()
+    else:
+        handler = output
+    handler.addFilter(RateLimitFilter())
+    logger.addHandler(handler)
+    return logger
+
+def shutdown():
+    """Flush queued records and remove the handlers installed by configure()"""
+    logger = get_logger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        # The listener is kept on the handler so a reloaded module can still stop it
+        if getattr(handler, "listener", None) is not None:
+            handler.listener.stop()
+        handler.close()
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is at the time, as print() does"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Formatting is left to the listener thread; only the arguments are rendered here,
+        # since they may be mutated once the emitting call returns
+        record = logging.makeLogRecord(dict(record.__dict__, msg=record.getMessage(), args=None))
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
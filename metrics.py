@@ -0,0 +1,160 @@
+import bisect
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Bucket upper bounds in seconds, from quick selections up to long boolean and thread operations
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Busy timer ticks are meant to stay around the scheduler budget, so their buckets are finer
+TICK_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.015, 0.02, 0.025, 0.03, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+HTTP_METHODS = ("GET", "POST", "DELETE")
+
+# Label for jobs that are not REST actions (internal main-thread calls), unknown paths and methods
+OTHER = "other"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Paths with ids in them are reported by route so the number of series stays bounded
+ROUTES = {'/v1/commands', '/v1/commands/batch', '/v1/jobs', '/v1/events', '/v1/models',
+          '/v1/files', '/v1/sessions', '/v1/status', '/v1/metrics'}
+ROUTE_PATTERNS = (
+    (re.compile(r'/v1/jobs/[^/]+'), '/v1/jobs/{id}'),
+    (re.compile(r'/v1/models/.+/mesh'), '/v1/models/{name}/mesh'),
+    (re.compile(r'/v1/models/.+/face_groups'), '/v1/models/{name}/face_groups'),
+    (re.compile(r'/v1/files/[^/]+'), '/v1/files/{id}'),
+    (re.compile(r'/v1/sessions/[^/]+'), '/v1/sessions/{id}'),
+    (re.compile(r'/v1/commands/[^/]+'), '/v1/commands/{action}'),
+)
+
+def route_label(path):
+    """The route a request path belongs to, e.g. ``/v1/jobs/{id}``"""
+    path = urlsplit(path).path
+    if path in ROUTES:
+        return path
+    for pattern, label in ROUTE_PATTERNS:
+        if pattern.fullmatch(path):
+            return label
+    return OTHER
+
+class Histogram:
+    """Prometheus histogram with preallocated bucket counts.
+
+    ``observe`` only increments existing slots, so recording a value allocates
+    nothing; counts are made cumulative when rendered.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name, labels=""):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        prefix = labels + "," if labels else ""
+        cumulative = 0
+        for bound, n in zip(self.bounds + ("+Inf",), counts):
+            cumulative += n
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {total}"
+        yield f"{name}_count{suffix} {count}"
+
+class Metrics:
+    """Counters and histograms for GET /v1/metrics.
+
+    Per-action series are created up front for every action name, and HTTP
+    series the first time a method/route/status combination is seen, so the
+    hot paths only increment existing values.
+    """
+
+    def __init__(self, actions):
+        self.queue_wait = Histogram()
+        self.tick_duration = Histogram(TICK_BUCKETS)
+        self.ticks = 0
+        self.action_latency = {action: Histogram() for action in list(actions) + [OTHER]}
+        self.action_errors = dict.fromkeys(self.action_latency, 0)
+        self.http_latency = {}  # (method, route) -> Histogram
+        self.http_requests = {}  # (method, route, status) -> count
+        self._lock = threading.Lock()
+
+    def observe_job(self, action, wait, duration, failed):
+        """Record a job's enqueue-to-start wait and execution time (main thread)"""
+        if action not in self.action_latency:
+            action = OTHER
+        self.queue_wait.observe(wait)
+        self.action_latency[action].observe(duration)
+        if failed:
+            self.action_errors[action] += 1
+
+    def observe_tick(self, duration, busy):
+        """Count a timer tick and record its duration if it ran commands (main thread)"""
+        self.ticks += 1
+        if busy:
+            self.tick_duration.observe(duration)
+
+    def observe_http(self, method, path, status, duration):
+        key = (method if method in HTTP_METHODS else OTHER, route_label(path))
+        histogram = self.http_latency.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.http_latency.setdefault(key, Histogram())
+        histogram.observe(duration)
+        with self._lock:
+            self.http_requests[key + (status,)] = self.http_requests.get(key + (status,), 0) + 1
+
+    def render(self, gauges):
+        """Prometheus text exposition; ``gauges`` maps name -> (help, value) for values read at scrape time"""
+        lines = []
+        for name, (help, value) in gauges.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value}"]
+        lines += _family("blend_rest_queue_wait_seconds", "histogram",
+                         "Time commands waited in the queue before they started",
+                         self.queue_wait.samples("blend_rest_queue_wait_seconds"))
+        lines += _family("blend_rest_action_duration_seconds", "histogram",
+                         "Execution time of commands on Blender's main thread, by action",
+                         (sample for action, histogram in self.action_latency.items()
+                          for sample in histogram.samples("blend_rest_action_duration_seconds",
+                                                          f'action="{_escape(action)}"')))
+        lines += _family("blend_rest_action_errors_total", "counter",
+                         "Commands that raised an error, by action",
+                         (f'blend_rest_action_errors_total{{action="{_escape(action)}"}} {count}'
+                          for action, count in list(self.action_errors.items())))
+        lines += _family("blend_rest_ticks_total", "counter",
+                         "Timer ticks that checked the command queue",
+                         [f"blend_rest_ticks_total {self.ticks}"])
+        lines += _family("blend_rest_tick_duration_seconds", "histogram",
+                         "Duration of timer ticks that ran commands",
+                         self.tick_duration.samples("blend_rest_tick_duration_seconds"))
+        with self._lock:
+            requests = sorted(self.http_requests.items())
+            latency = sorted(self.http_latency.items())
+        lines += _family("blend_rest_http_requests_total", "counter",
+                         "HTTP requests answered, by method, route and status",
+                         (f'blend_rest_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                          for (method, route, status), count in requests))
+        lines += _family("blend_rest_http_request_duration_seconds", "histogram",
+                         "Time from reading a request to finishing its response, by method and route",
+                         (sample for (method, route), histogram in latency
+                          for sample in histogram.samples("blend_rest_http_request_duration_seconds",
+                                                          f'method="{method}",route="{route}"')))
+        return "\n".join(lines) + "\n"
+
+def _family(name, type, help, samples):
+    return [f"# HELP {name} {help}", f"# TYPE {name} {type}", *samples]
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
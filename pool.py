@@ -0,0 +1,123 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+_local = threading.local()
+
+# Seconds a thread that came back from blocking() to a full pool stays around for reuse
+SPARE_SECONDS = 30.0
+
+class WorkerPool:
+    """Threads that run submitted tasks, at most ``size`` of them at a time.
+
+    A task that has to wait for a long time (a ``?wait=true`` command, a
+    long-poll, an event stream) wraps the wait in ``blocking()``: its thread
+    stops counting against ``size`` meanwhile and another one is started if
+    tasks are queued, so waiting clients cannot starve quick requests.
+    """
+
+    def __init__(self, size, name="worker"):
+        self.size = size
+        self.name = name
+        self._tasks = deque()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._spares = threading.Condition(self._lock)
+        self._threads = 0  # threads counting against size: waiting for a task or running one outside blocking()
+        self._idle = 0  # counted threads waiting for a task that no submit() has claimed yet
+        self._spare = 0  # uncounted threads kept for reuse
+        self._claims = 0  # spares asked to rejoin the pool
+        self._started = 0
+        self._closed = False
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._closed:
+                return
+            self._tasks.append((func, args))
+            if self._idle:
+                # Claimed here rather than by the woken thread, so the next submit() doesn't count it as idle
+                self._idle -= 1
+                self._work.notify()
+            else:
+                self._add_thread()
+
+    def shutdown(self):
+        """Let every thread exit once its current task is done; queued tasks are dropped"""
+        with self._lock:
+            self._closed = True
+            self._tasks.clear()
+            self._work.notify_all()
+            self._spares.notify_all()
+
+    @contextmanager
+    def blocking(self):
+        with self._lock:
+            self._threads -= 1
+            if self._tasks:
+                self._add_thread()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads += 1
+
+    def _add_thread(self):
+        # Called with the lock held; reuses a spare thread when there is one
+        if self._threads >= self.size:
+            return
+        self._threads += 1
+        if self._spare > self._claims:
+            self._claims += 1
+            self._spares.notify()
+            return
+        self._started += 1
+        threading.Thread(target=self._run, name=f"{self.name}-{self._started}", daemon=True).start()
+
+    def _run(self):
+        _local.pool = self
+        with self._lock:
+            while True:
+                while not self._tasks and not self._closed and self._threads <= self.size:
+                    self._idle += 1
+                    self._work.wait()
+                if self._closed:
+                    self._threads -= 1
+                    return
+                if self._threads > self.size:
+                    # Back from blocking() to a full pool
+                    self._threads -= 1
+                    if not self._wait_as_spare():
+                        return
+                    continue
+                func, args = self._tasks.popleft()
+                self._lock.release()
+                try:
+                    func(*args)
+                except Exception:
+                    pass  # tasks handle their own errors; one failing must not end the thread
+                finally:
+                    self._lock.acquire()
+
+    def _wait_as_spare(self):
+        """Wait (lock held) until _add_thread() claims this thread; False when it should exit"""
+        self._spare += 1
+        while not self._claims and not self._closed:
+            if not self._spares.wait(SPARE_SECONDS):
+                break
+        self._spare -= 1
+        if self._claims and not self._closed:
+            # _add_thread() already counted this thread
+            self._claims -= 1
+            return True
+        return False
+
+@contextmanager
+def blocking():
+    """Mark the calling thread as waiting if it belongs to a WorkerPool; a no-op otherwise"""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        yield
+        return
+    with pool.blocking():
+        yield
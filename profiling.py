@@ -0,0 +1,83 @@
+import cProfile
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+
+from .log import get_logger
+
+logger = get_logger("profiling")
+
+# Where .prof files are kept; set BLEND_REST_PROFILE_DIR to change it
+PROFILE_DIR = os.environ.get("BLEND_REST_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "blend-rest-profiles")
+
+# Fraction of commands profiled without asking (0 disables sampling); BLEND_REST_PROFILE_RATE or headless.py --profile-rate
+sample_rate = float(os.environ.get("BLEND_REST_PROFILE_RATE") or 0.0)
+
+# Functions listed in a job's profile summary, by cumulative time
+TOP_FUNCTIONS = 25
+
+# Older .prof files are deleted once there are more than this many
+MAX_PROFILES = 200
+
+_PROFILE_FILE = re.compile(r'\d+-job-\d+\.prof')
+_lock = threading.Lock()
+
+def wanted(command):
+    """Whether to profile a command: asked for with ``"profile": true`` or picked by sampling"""
+    return bool(command.get("profile")) or (sample_rate > 0 and random.random() < sample_rate)
+
+def profile_call(job, func, *args):
+    """Run ``func(*args)`` under cProfile and attach a summary to ``job.profile``, even if it raises"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Only one profiler can be active, e.g. when Blender itself runs under one
+        job.profile = {"error": str(e)}
+        return func(*args)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        job.profile = {"wall_time": wall, "cpu_time": cpu, "top": top_functions(profiler)}
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(profile_path(job.id))
+            job.profile["url"] = f"/v1/jobs/{job.id}/profile"
+            _prune()
+        except OSError as e:
+            logger.warning("Could not write profile of job %s: %s", job.id, e)
+
+def top_functions(profiler, limit=TOP_FUNCTIONS):
+    """The ``limit`` functions with the most cumulative time, as plain dicts"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        "function": pstats.func_std_string(pstats.func_strip_path(func)),
+        "calls": calls,
+        "primitive_calls": primitive_calls,
+        "total_time": total_time,
+        "cumulative_time": cumulative_time,
+    } for func, (primitive_calls, calls, total_time, cumulative_time, _) in rows]
+
+def profile_path(job_id):
+    # Workers behind the dispatcher share the folder and number their jobs independently
+    return os.path.join(PROFILE_DIR, f"{os.getpid()}-job-{job_id}.prof")
+
+def _prune():
+    with _lock:
+        files = [name for name in os.listdir(PROFILE_DIR) if _PROFILE_FILE.fullmatch(name)]
+        if len(files) <= MAX_PROFILES:
+            return
+        paths = sorted((os.path.join(PROFILE_DIR, name) for name in files), key=os.path.getmtime)
+        for path in paths[:len(paths) - MAX_PROFILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
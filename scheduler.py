@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+class SessionQueue:
+    """Job queue with one FIFO per session, drained round-robin.
+
+    A drop-in for ``queue.Queue`` as far as the scheduler is concerned: each
+    ``get_nowait`` takes the next job of the session after the one served last,
+    so a client flooding the queue cannot starve the others. Jobs without a
+    session share one sub-queue.
+    """
+
+    def __init__(self):
+        self._queues = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        with self._lock:
+            self._queues.setdefault(job.session, deque()).append(job)
+            self._size += 1
+
+    def get_nowait(self):
+        with self._lock:
+            if not self._queues:
+                raise queue.Empty
+            session, jobs = next(iter(self._queues.items()))
+            job = jobs.popleft()
+            self._size -= 1
+            if jobs:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            return job
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def depths(self):
+        """Queued jobs per session"""
+        with self._lock:
+            return {session: len(jobs) for session, jobs in self._queues.items()}
+
+class CommandScheduler:
+    """Drain the command queue from a ``bpy.app.timers`` callback in time-budgeted ticks.
+
+    Each tick executes queued jobs until ``budget`` seconds have been spent, so a
+    burst of heavy commands is spread over several ticks instead of freezing
+    Blender's UI. While work is pending the timer fires again after
+    ``busy_interval``; once the queue runs dry the interval starts at
+    ``min_idle_interval`` and backs off geometrically up to ``max_idle_interval``.
+    Timers cannot be woken from the HTTP thread, so the idle interval caps the
+    pickup latency of the first command after a quiet period.
+    """
+
+    def __init__(self, command_queue, execute, budget=0.02, busy_interval=0.0,
+                 min_idle_interval=0.005, max_idle_interval=0.05, backoff=1.5, window=256):
+        self.queue = command_queue
+        self.execute = execute
+        self.budget = budget
+        self.busy_interval = busy_interval
+        self.min_idle_interval = min_idle_interval
+        self.max_idle_interval = max_idle_interval
+        self.backoff = backoff
+        self.interval = min_idle_interval
+        self.ticks = 0
+        self.jobs_run = 0
+        self._timings = deque(maxlen=window)  # (tick duration in seconds, jobs run) of busy ticks
+        self._lock = threading.Lock()
+
+    def tick(self):
+        """Run one budgeted drain and return the delay until the next tick"""
+        start = time.perf_counter()
+        deadline = start + self.budget
+        ran = 0
+        while True:
+            try:
+                job = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.execute(job)
+            ran += 1
+            if time.perf_counter() >= deadline:
+                break
+        duration = time.perf_counter() - start
+
+        if ran:
+            with self._lock:
+                self.ticks += 1
+                self.jobs_run += ran
+                self._timings.append((duration, ran))
+            self.interval = self.busy_interval if not self.queue.empty() else self.min_idle_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_idle_interval) or self.min_idle_interval
+        return self.interval
+
+    def stats(self):
+        """Summarize recent busy ticks for the status endpoint"""
+        with self._lock:
+            timings = list(self._timings)
+            ticks, jobs_run = self.ticks, self.jobs_run
+        durations = sorted(d for d, _ in timings)
+        data = {
+            "queue_depth": self.queue.qsize(),
+            "interval": self.interval,
+            "budget": self.budget,
+            "busy_ticks": ticks,
+            "jobs_run": jobs_run,
+        }
+        if durations:
+            data.update({
+                "last_tick": timings[-1][0],
+                "mean_tick": sum(durations) / len(durations),
+                "p95_tick": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+                "max_tick": durations[-1],
+                "jobs_per_tick": sum(n for _, n in timings) / len(timings),
+            })
+        return data
@@ -0,0 +1,84 @@
+import bpy
+import contextlib
+import re
+
+# Request header naming the session a command belongs to (also used by dispatcher.py)
+SESSION_HEADER = "X-Session-Id"
+
+# Scene names are limited to 63 bytes, which bounds the id
+_SESSION_ID = re.compile(r'[A-Za-z0-9_.-]{1,48}')
+
+# Actions that act on Blender's single global undo history and cannot be scoped to a session
+GLOBAL_ACTIONS = ("undo", "redo")
+
+def valid_session_id(session):
+    return bool(_SESSION_ID.fullmatch(session))
+
+def uses_global_actions(cmd):
+    """Whether a command, or any step of a batch, is an undo/redo"""
+    steps = cmd.get("commands")
+    return cmd.get("action") in GLOBAL_ACTIONS or any(
+        uses_global_actions(step) for step in (steps if isinstance(steps, list) else []) if isinstance(step, dict))
+
+def scene_name(session):
+    return f"Session {session}"
+
+def session_scene(session):
+    """The scene of a session, created empty on first use"""
+    name = scene_name(session)
+    return bpy.data.scenes.get(name) or bpy.data.scenes.new(name)
+
+@contextlib.contextmanager
+def session_scope(session):
+    """Run the body with a session's scene, view layer and collection as the context.
+
+    Selection and the active object live in the view layer, so sessions do not
+    see each other's. The window (if any) shows the session scene while the
+    body runs, so operators that read the scene from the window agree with
+    ``bpy.context``; the previous scene is restored afterwards. Yields the
+    session scene, or None without a session, when the body runs in the
+    current context.
+    """
+    if session is None:
+        yield None
+        return
+    scene = session_scene(session)
+    view_layer = scene.view_layers[0]
+    overrides = {"scene": scene, "view_layer": view_layer, "collection": scene.collection}
+    window = bpy.context.window
+    previous = window.scene if window else None
+    if window:
+        overrides["window"] = window
+        window.scene = scene
+    try:
+        with bpy.context.temp_override(**overrides):
+            yield scene
+    finally:
+        if window and window.scene != previous:
+            window.scene = previous
+
+def list_sessions(depths):
+    """Describe the session scenes with their queued job counts (runs on the main thread)"""
+    prefix = scene_name("")
+    sessions = []
+    for scene in bpy.data.scenes:
+        if scene.name.startswith(prefix):
+            session = scene.name[len(prefix):]
+            sessions.append({"session": session, "objects": len(scene.objects), "queued": depths.get(session, 0)})
+    return sessions
+
+def remove_session(session):
+    """Delete a session's scene and the objects only it uses (runs on the main thread)"""
+    scene = bpy.data.scenes.get(scene_name(session))
+    if scene is None:
+        raise LookupError(f"Session '{session}' not found")
+    window = bpy.context.window
+    if window and window.scene == scene:
+        raise ValueError(f"Session '{session}' is the scene shown in the window")
+    removed = 0
+    for obj in list(scene.objects):
+        if len(obj.users_scene) == 1:
+            bpy.data.objects.remove(obj, do_unlink=True)
+            removed += 1
+    bpy.data.scenes.remove(scene)
+    return {"session": session, "removed_objects": removed}
@@ -0,0 +1,169 @@
+import base64
+import bisect
+import json
+import threading
+import uuid
+
+# Fields a /v1/models client may select with ?fields=
+OBJECT_FIELDS = ("name", "type", "location", "rotation", "dimensions")
+
+def encode_cursor(name):
+    return base64.urlsafe_b64encode(name.encode()).decode()
+
+def decode_cursor(cursor):
+    return base64.urlsafe_b64decode(cursor.encode()).decode()
+
+class SceneSnapshot:
+    """Immutable, versioned view of the scene's objects that HTTP threads can read freely.
+
+    ``objects`` maps object names to their description and must not be mutated.
+    ``sorted_names`` and ``names_by_type`` index the same names in sorted order
+    for filtered and paginated queries. The JSON body is serialized lazily by
+    the first request that needs it.
+    """
+
+    def __init__(self, version, objects, boot_id, sorted_names=(), names_by_type=None):
+        self.version = version
+        self.objects = objects
+        self.sorted_names = sorted_names
+        self.names_by_type = names_by_type or {}
+        self.etag = f'"{boot_id}-{version}"'
+        self._body = None
+
+    @property
+    def body(self):
+        if self._body is None:
+            # Serializing twice under a race is harmless; the result is identical
+            self._body = json.dumps(list(self.objects.values())).encode()
+        return self._body
+
+    def query(self, type=None, name_prefix=None, fields=None, limit=None, cursor=None):
+        """Return ``(objects, next_cursor)`` for objects matching the filters, in name order.
+
+        ``cursor`` is the opaque value returned as ``next_cursor`` by the previous page.
+        """
+        names = self.names_by_type.get(type.upper(), ()) if type else self.sorted_names
+        start = 0
+        if name_prefix:
+            start = bisect.bisect_left(names, name_prefix)
+        if cursor:
+            start = max(start, bisect.bisect_right(names, decode_cursor(cursor)))
+
+        objects = []
+        next_cursor = None
+        for i in range(start, len(names)):
+            name = names[i]
+            if name_prefix and not name.startswith(name_prefix):
+                break
+            if limit is not None and len(objects) == limit:
+                next_cursor = encode_cursor(names[i - 1])
+                break
+            entry = self.objects[name]
+            objects.append({f: entry[f] for f in fields} if fields else entry)
+        return objects, next_cursor
+
+class SnapshotPublisher:
+    """Rebuild scene snapshots on Blender's main thread and publish them atomically.
+
+    Only objects marked dirty (by executed commands or depsgraph updates) and
+    objects that appeared since the last snapshot are described again; removed
+    objects are dropped. The sorted name and per-type indexes are updated in
+    place for those objects only. HTTP threads only ever read ``current``.
+
+    ``on_change(added, modified, removed)`` is called with the new entries of
+    added and modified objects and the names of removed ones whenever a
+    refresh finds real differences; a refresh without any keeps the current
+    snapshot, and with it the ETag clients hold.
+    """
+
+    def __init__(self, describe, on_change=None):
+        self.describe = describe
+        self.on_change = on_change
+        self._boot_id = uuid.uuid4().hex[:8]  # keeps ETags from matching across restarts
+        self._entries = {}
+        self._sorted_names = []
+        self._names_by_type = {}
+        self._dirty = set()
+        self._all_dirty = True
+        self._pending = True
+        self._built = False
+        self._lock = threading.Lock()
+        self.current = SceneSnapshot(0, {}, self._boot_id)
+
+    def mark_dirty(self, names):
+        with self._lock:
+            self._dirty.update(names)
+            self._pending = True
+
+    def mark_all_dirty(self):
+        with self._lock:
+            self._all_dirty = True
+            self._pending = True
+
+    def refresh(self, objects):
+        """Publish a new snapshot if anything changed; must run on the main thread"""
+        with self._lock:
+            if not self._pending:
+                return self.current
+            dirty, self._dirty = self._dirty, set()
+            all_dirty, self._all_dirty = self._all_dirty, False
+            self._pending = False
+
+        ordered_names = objects.keys()
+        names = set(ordered_names)
+        added, modified = [], []
+        if all_dirty:
+            previous = self._entries
+            self._entries = {name: self.describe(objects[name]) for name in ordered_names}
+            removed = [name for name in previous if name not in names]
+            for name, entry in self._entries.items():
+                if name not in previous:
+                    added.append(entry)
+                elif previous[name] != entry:
+                    modified.append(entry)
+            self._sorted_names = sorted(names)
+            self._names_by_type = {}
+            for name in self._sorted_names:
+                self._names_by_type.setdefault(self._entries[name]["type"], []).append(name)
+        else:
+            removed = list(self._entries.keys() - names)
+            for name in removed:
+                self._unindex(name)
+                del self._entries[name]
+            for name in (dirty & names) | (names - self._entries.keys()):
+                entry = self.describe(objects[name])
+                previous = self._entries.get(name)
+                if previous == entry:
+                    continue
+                if previous is None:
+                    added.append(entry)
+                else:
+                    modified.append(entry)
+                    self._unindex(name)
+                self._entries[name] = entry
+                self._index(name)
+
+        # The first build describes the scene as found rather than changes to it
+        first_build, self._built = not self._built, True
+        if not (added or modified or removed):
+            return self.current
+        if self.on_change and not first_build:
+            self.on_change(added, modified, removed)
+
+        # Publish in bpy.data.objects order, matching what iterating the scene returns
+        published = {name: self._entries[name] for name in ordered_names}
+        self.current = SceneSnapshot(
+            self.current.version + 1, published, self._boot_id,
+            tuple(self._sorted_names),
+            {t: tuple(n) for t, n in self._names_by_type.items() if n})
+        return self.current
+
+    def _index(self, name):
+        bisect.insort(self._sorted_names, name)
+        bisect.insort(self._names_by_type.setdefault(self._entries[name]["type"], []), name)
+
+    def _unindex(self, name):
+        for names in (self._sorted_names, self._names_by_type.get(self._entries[name]["type"], [])):
+            i = bisect.bisect_left(names, name)
+            if i < len(names) and names[i] == name:
+                del names[i]